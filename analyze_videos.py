@@ -0,0 +1,29 @@
+"""
+녹화 영상 오프라인 분석 (Streamlit UI 없이 실행)
+
+사용 예:
+    python analyze_videos.py assets/videos/street_demo.mp4 -o results.jsonl --workers 4
+"""
+import argparse
+
+from src.pipeline.offline_analysis import run_offline_analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 영상을 헤드리스로 분석하여 프레임별 결과를 JSONL로 저장합니다.")
+    parser.add_argument("videos", nargs="+", help="분석할 영상 파일 경로")
+    parser.add_argument("-o", "--output", default="analysis.jsonl", help="결과 JSONL 파일 경로")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--segment-frames", type=int, default=300, help="워커에 분배할 구간당 프레임 수")
+    parser.add_argument("--context", nargs="*", default=[], help="광고 선정에 사용할 컨텍스트 태그 (e.g., rainy_day morning_rush)")
+    args = parser.parse_args()
+
+    summary = run_offline_analysis(
+        args.videos, args.output,
+        workers=args.workers, segment_frames=args.segment_frames, context_tags=args.context,
+    )
+    print(f"Total: {summary['frames']} frames in {summary['seconds']:.1f} s ({summary['fps']:.1f} fps) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+광고 DB 로드/재로드 벤치마크.
+대규모 가상 카탈로그를 일반 형식과 압축 형식(compact-v1)으로 저장한 뒤,
+초기 로드(읽기 + 검증 + 색인)와 일부 광고만 바뀐 경우의 재로드 시간을 측정합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.catalogue_benchmark --ads 10000 50000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from config import settings
+from benchmarks.selection_benchmark import make_catalogue
+from src.logic.ad_database import load_ad_database, save_compact_ad_database
+from src.logic.catalogue_watcher import AdCatalogueWatcher
+from src.logic.selection_engine import AdSelectionEngine
+
+# make_catalogue가 쓰는 가상 태그를 허용 목록에 추가
+settings.AD_EXTRA_TAGS = list(settings.AD_EXTRA_TAGS) + [f"tag_{i}" for i in range(200)]
+
+
+def best_of(fn, repeat):
+    """repeat번 실행한 최소 시간(초)과 마지막 결과를 반환합니다."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def mutate(ad_db, fraction, seed=1):
+    """광고 일부의 가중치/태그를 바꾸고, 같은 수만큼 삭제/추가한 카탈로그를 만듭니다."""
+    rng = random.Random(seed)
+    ad_db = {ad_id: dict(ad_info, tags=list(ad_info["tags"])) for ad_id, ad_info in ad_db.items()}
+    count = max(1, int(len(ad_db) * fraction))
+    ad_ids = rng.sample(list(ad_db), count * 2)
+    for ad_id in ad_ids[:count]:
+        ad_db[ad_id]["weight"] = rng.random()
+        ad_db[ad_id]["tags"][0] = f"tag_{rng.randrange(200)}"
+    for ad_id in ad_ids[count:]:
+        del ad_db[ad_id]
+    for i in range(count):
+        ad_db[f"new{i:06d}"] = {"file_path": f"assets/ads/new{i:06d}.mp4", "tags": ["all", "tag_0"], "weight": 1.0}
+    return ad_db
+
+
+def run(num_ads, fraction, repeat, workdir):
+    ad_db = make_catalogue(num_ads)
+    verbose_path = os.path.join(workdir, f"ads_{num_ads}.json")
+    compact_path = os.path.join(workdir, f"ads_{num_ads}.compact.json")
+    with open(verbose_path, "w", encoding="utf-8") as f:
+        json.dump(ad_db, f, ensure_ascii=False, indent=4)
+    save_compact_ad_database(ad_db, compact_path)
+
+    print(f"\n=== {num_ads} ads ===")
+    for name, path in (("verbose", verbose_path), ("compact", compact_path)):
+        load_seconds, loaded = best_of(lambda: load_ad_database(path), repeat)
+        index_seconds, _ = best_of(lambda: AdSelectionEngine(loaded), repeat)
+        print(f"  {name:8s} {os.path.getsize(path) / 1024:8.0f} KiB  load {load_seconds * 1000:7.1f}ms  "
+              f"index {index_seconds * 1000:7.1f}ms  ({len(loaded)} ads)")
+
+    # 재로드: 원본을 로드한 엔진에 fraction 만큼 바뀐 카탈로그를 반영
+    engine = AdSelectionEngine(load_ad_database(compact_path))
+    watcher = AdCatalogueWatcher(compact_path, engine, interval=0)
+    save_compact_ad_database(mutate(ad_db, fraction), compact_path)
+    start = time.perf_counter()
+    watcher.reload()
+    reload_seconds = time.perf_counter() - start
+    print(f"  reload with {fraction:.0%} changed: {reload_seconds * 1000:.1f}ms total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ad catalogue load/reload benchmark")
+    parser.add_argument("--ads", type=int, nargs="+", default=[10000, 50000], help="카탈로그 광고 수")
+    parser.add_argument("--changed", type=float, default=0.01, help="재로드 시 바뀌는 광고 비율")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for num_ads in args.ads:
+            run(num_ads, args.changed, args.repeat, workdir)
+
+
+if __name__ == "__main__":
+    main()
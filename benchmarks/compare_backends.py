@@ -0,0 +1,169 @@
+"""
+추론 백엔드 정확도 / 속도 비교
+
+참조 영상에서 각 백엔드(default / onnxruntime / openvino)와 변환 모델 정밀도(fp32 / int8)로
+사람 감지와 연령/성별 분류를 실행하고, 기준 결과 대비 감지 일치율(IoU >= 0.5 재현율/정밀도),
+감지 mAP50, 태그 일치율, 프레임당 지연 시간을 비교합니다.
+기준은 int8이면 같은 백엔드의 fp32 결과, 그 외에는 default 백엔드 결과입니다.
+변환 모델이 하나라도 없는 백엔드/정밀도는 (default 백엔드로 대체해 측정하지 않고) 건너뜀으로 표시합니다.
+(int8을 기본값으로 쓰기 전에 fp32 대비 mAP50 하락을 확인하는 용도)
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.compare_backends --clip assets/videos/street_demo.mp4 --frames 200
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from config import settings
+from benchmarks.run_benchmarks import load_clip_frames
+from src.analysis.tracker import _iou_matrix
+
+BACKENDS = ("default", "onnxruntime", "openvino")
+PRECISIONS = ("fp32", "int8")
+MODEL_KEYS = ("person", "face", "age", "gender")
+
+
+def missing_models(backend, precision):
+    """
+    해당 백엔드/정밀도의 변환 모델 중 파일이 없는 모델 키 목록을 반환합니다. (default 백엔드는 항상 빈 리스트)
+    모델이 없으면 로더가 조용히 default 백엔드로 대체하므로, 비교 전에 미리 확인합니다.
+    """
+    paths = {"onnxruntime": settings.ONNX_MODEL_PATHS, "openvino": settings.OPENVINO_MODEL_PATHS}.get(backend)
+    if paths is None:
+        return []
+    return [key for key in MODEL_KEYS
+            if not paths.get(key) or not os.path.exists(paths[key].format(precision=precision))]
+
+
+def run_backend(backend, precision, frames):
+    """한 백엔드/정밀도로 모든 프레임을 감지/분류하여 결과와 단계별 지연 시간을 반환합니다."""
+    settings.INFERENCE_BACKEND = backend
+    settings.INFERENCE_PRECISION = precision
+    from src.analysis.classifier import DemographicClassifier
+    from src.analysis.detector import PersonDetector
+    detector, classifier = PersonDetector(), DemographicClassifier()
+
+    detections, tags, scores = [], [], []
+    detect_times, classify_times = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        result = detector.detect_persons(frame)
+        boxes = result.boxes
+        detect_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        codes, _ = classifier.classify_persons(frame, boxes)
+        classify_times.append(time.perf_counter() - start)
+
+        detections.append(boxes)
+        tags.append(codes.tolist()) # 박스별 그룹 코드 (미분류 포함, 태그 일치율 비교용)
+        scores.append(result.scores)
+    return detections, tags, scores, np.array(detect_times) * 1000, np.array(classify_times) * 1000
+
+
+def match_stats(reference, candidate):
+    """
+    기준 감지 결과 대비 후보 결과의 재현율/정밀도와, 매칭된 사람들의 태그 일치율을 계산합니다.
+
+    Args:
+        reference, candidate (tuple): (프레임별 박스 리스트, 프레임별 태그 리스트)
+    """
+    matched = ref_total = cand_total = tag_same = 0
+    for ref_boxes, ref_tags, cand_boxes, cand_tags in zip(*reference, *candidate):
+        ref_total += len(ref_boxes)
+        cand_total += len(cand_boxes)
+        if len(ref_boxes) == 0 or len(cand_boxes) == 0:
+            continue
+        iou = _iou_matrix(ref_boxes, cand_boxes)
+        used = set()
+        for r_idx in range(len(ref_boxes)):
+            c_idx = int(iou[r_idx].argmax())
+            if iou[r_idx, c_idx] >= 0.5 and c_idx not in used:
+                used.add(c_idx)
+                matched += 1
+                tag_same += ref_tags[r_idx] == cand_tags[c_idx]
+    return {
+        "recall": matched / ref_total if ref_total else 1.0,
+        "precision": matched / cand_total if cand_total else 1.0,
+        "tag_agreement": tag_same / matched if matched else 1.0,
+    }
+
+
+def average_precision(reference_boxes, candidate_boxes, candidate_scores, iou_threshold=0.5):
+    """
+    기준 감지 결과를 정답으로 보고 후보 감지 결과의 AP를 계산합니다. (사람 클래스 하나이므로 mAP와 같음)
+    신뢰도 내림차순으로 정답 박스와 매칭한 정밀도-재현율 곡선을 전 구간 보간(COCO/VOC 방식)으로 적분합니다.
+    """
+    total = sum(len(boxes) for boxes in reference_boxes)
+    if total == 0:
+        return 1.0
+    entries = [] # (신뢰도, 프레임 번호, 박스 번호)
+    for frame_idx, scores in enumerate(candidate_scores):
+        entries.extend((float(score), frame_idx, box_idx) for box_idx, score in enumerate(scores))
+    entries.sort(key=lambda entry: -entry[0])
+
+    used = [np.zeros(len(boxes), dtype=bool) for boxes in reference_boxes]
+    hits = np.zeros(len(entries))
+    for rank, (_, frame_idx, box_idx) in enumerate(entries):
+        ref_boxes = reference_boxes[frame_idx]
+        if len(ref_boxes) == 0:
+            continue
+        iou = _iou_matrix(candidate_boxes[frame_idx][box_idx:box_idx + 1], ref_boxes)[0]
+        iou[used[frame_idx]] = 0.0
+        best = int(iou.argmax())
+        if iou[best] >= iou_threshold:
+            used[frame_idx][best] = True
+            hits[rank] = 1.0
+
+    true_positives = np.cumsum(hits)
+    recall = np.concatenate([[0.0], true_positives / total, [1.0]])
+    precision = np.concatenate([[1.0], true_positives / np.arange(1, len(entries) + 1), [0.0]])
+    precision = np.maximum.accumulate(precision[::-1])[::-1] # 오른쪽 최댓값으로 보간
+    return float(np.sum(np.diff(recall) * precision[1:]))
+
+
+def run_name(run):
+    backend, precision = run
+    return backend if backend == "default" else f"{backend}/{precision}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inference backends on a reference clip")
+    parser.add_argument("--clip", default=settings.DEMO_VIDEO_PATH, help="참조 영상")
+    parser.add_argument("--frames", type=int, default=200, help="비교할 프레임 수")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--precisions", nargs="+", default=list(PRECISIONS), choices=PRECISIONS,
+                        help="onnxruntime/openvino 변환 모델 정밀도")
+    args = parser.parse_args()
+
+    frames = load_clip_frames(args.clip, args.frames)
+    runs = []
+    for backend in args.backends:
+        runs += [(backend, "fp32")] if backend == "default" else [(backend, precision) for precision in args.precisions]
+    skipped = {run: missing_models(*run) for run in runs}
+    results = {run: run_backend(*run, frames) for run in runs if not skipped[run]}
+
+    print(f"{'backend':<18} {'reference':<18} {'detect p50':>11} {'classify p50':>13} {'fps':>7} "
+          f"{'recall':>7} {'precision':>9} {'mAP50':>6} {'tags':>6}")
+    for run in runs:
+        if skipped[run]:
+            print(f"{run_name(run):<18} skipped (missing converted models: {', '.join(skipped[run])})")
+            continue
+        detections, tags, scores, detect_ms, classify_ms = results[run]
+        # int8은 같은 백엔드의 fp32, fp32는 default 백엔드를 기준으로 비교
+        reference_run = (run[0], "fp32") if run[1] == "int8" else ("default", "fp32")
+        reference = results.get(reference_run) if reference_run != run else None
+        fps = 1000 / (detect_ms.mean() + classify_ms.mean())
+        line = (f"{run_name(run):<18} {run_name(reference_run) if reference else '-':<18} "
+                f"{np.median(detect_ms):9.1f}ms {np.median(classify_ms):11.1f}ms {fps:7.1f}")
+        if reference is not None:
+            stats = match_stats(reference[:2], (detections, tags))
+            ap50 = average_precision(reference[0], detections, scores)
+            line += f" {stats['recall']:7.1%} {stats['precision']:9.1%} {ap50:6.1%} {stats['tag_agreement']:6.1%}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
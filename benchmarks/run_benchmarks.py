@@ -0,0 +1,285 @@
+"""
+파이프라인 단계별 벤치마크 (CPU 전용, 네트워크 불필요)
+
+생성한 프레임(또는 녹화 영상)에 사람 수를 조절하여 각 단계를 구동하고,
+단계별 처리량과 p50/p95/p99 지연 시간, 전체(end-to-end) FPS를 측정합니다.
+합성 프레임의 사람은 얼굴 검출기를 통과하지 못하므로, 나이/성별 배치 추론은 합성 얼굴 크롭으로 따로 측정하고
+합성 프레임의 end-to-end는 YOLO 결과 대신 정답 박스로 트래킹/분류를 구동합니다.
+결과는 JSON으로 저장하며, 저장된 기준값(baseline)보다 느려지면 0이 아닌 코드로 종료합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from config import settings
+from benchmarks.selection_benchmark import make_catalogue
+from src.analysis.aggregator import DataAggregator
+from src.analysis.results import NUM_DEMOGRAPHIC_CODES
+from src.analysis.tracker import PersonTracker
+from src.logic.selection_engine import AdSelectionEngine
+from src.utils.drawing import draw_results
+
+FRAME_SIZE = (720, 1280) # (height, width)
+
+
+def make_synthetic_frame(num_people, seed=0, frame_size=FRAME_SIZE):
+    """
+    사람 형태(머리 + 몸통)를 num_people 명 그린 합성 프레임을 생성합니다.
+
+    Returns:
+        tuple: (frame, boxes) - boxes는 각 사람의 (x1, y1, x2, y2) 정답 박스 (N, 4) int32 배열
+    """
+    rng = np.random.default_rng(seed)
+    height, width = frame_size
+    frame = np.full((height, width, 3), 90, dtype=np.uint8)
+    frame += rng.integers(0, 20, size=frame.shape, dtype=np.uint8) # 배경 노이즈
+
+    boxes = []
+    for _ in range(num_people):
+        person_h = int(rng.integers(height // 5, height // 2))
+        person_w = person_h // 3
+        x1 = int(rng.integers(0, width - person_w))
+        y1 = int(rng.integers(0, height - person_h))
+        skin = tuple(int(c) for c in rng.integers(120, 220, size=3))
+        cloth = tuple(int(c) for c in rng.integers(0, 255, size=3))
+        head_r = person_w // 3
+        cv2.circle(frame, (x1 + person_w // 2, y1 + head_r), head_r, skin, -1)
+        cv2.rectangle(frame, (x1, y1 + 2 * head_r), (x1 + person_w, y1 + person_h), cloth, -1)
+        boxes.append([x1, y1, x1 + person_w, y1 + person_h])
+    return frame, np.array(boxes, dtype=np.int32).reshape(-1, 4)
+
+
+def make_face_crops(num_faces, seed=0):
+    """
+    나이/성별 네트워크 입력용 합성 얼굴 크롭(피부색 타원 + 노이즈)을 num_faces개 생성합니다.
+    크롭 크기는 실제 얼굴처럼 제각각이며, 네트워크 입력 크기로 리사이즈되므로 비용은 내용과 무관합니다.
+    """
+    rng = np.random.default_rng(seed)
+    crops = []
+    for _ in range(num_faces):
+        size = int(rng.integers(40, 160))
+        crop = rng.integers(0, 60, size=(size, size, 3), dtype=np.uint8)
+        skin = tuple(int(c) for c in rng.integers(120, 220, size=3))
+        cv2.ellipse(crop, (size // 2, size // 2), (size * 2 // 5, size // 2), 0, 0, 360, skin, -1)
+        crops.append(crop)
+    return crops
+
+
+def load_clip_frames(clip_path, max_frames):
+    cap = cv2.VideoCapture(clip_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def summarize(latencies):
+    """지연 시간 리스트(초)를 처리량과 백분위수(ms)로 요약합니다."""
+    arr = np.asarray(latencies) * 1000
+    return {
+        "calls": len(arr),
+        "throughput_per_sec": float(1000 / arr.mean()) if arr.mean() > 0 else float("inf"),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+    }
+
+
+def measure(fn, inputs, warmup=3):
+    """inputs 각각에 대해 fn을 실행하여 호출별 지연 시간을 측정합니다."""
+    for item in inputs[:warmup]:
+        fn(item)
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def load_models():
+    """로컬 모델 파일이 있을 때만 모델을 로드합니다. (네트워크 다운로드 방지)"""
+    detector = classifier = None
+    if os.path.exists(settings.YOLO_MODEL_PATH):
+        from src.analysis.detector import PersonDetector
+        detector = PersonDetector()
+    else:
+        print(f"[skip] detector: {settings.YOLO_MODEL_PATH} not found")
+
+    if all(os.path.exists(p) for p in (settings.FACE_MODEL, settings.AGE_MODEL, settings.GENDER_MODEL)):
+        from src.analysis.classifier import DemographicClassifier
+        classifier = DemographicClassifier()
+    else:
+        print("[skip] classifier: OpenCV DNN model files not found")
+    return detector, classifier
+
+
+def jitter_boxes(boxes, rng, step=4):
+    return boxes + rng.integers(-step, step + 1, size=boxes.shape, dtype=np.int32)
+
+
+def run(person_counts, iterations, clip_path=None, ads=10000):
+    detector, classifier = load_models()
+    ad_engine = AdSelectionEngine(make_catalogue(ads))
+    results = {}
+
+    # 녹화 영상이 주어지면 감지/분류/end-to-end 단계는 영상 프레임과 그 감지 박스를 사용
+    # (감지기가 없으면 프레임 전체를 사람 박스 하나로 사용)
+    clip_samples = None
+    if clip_path:
+        clip_frames = load_clip_frames(clip_path, iterations)
+        clip_samples = [
+            (frame, detector.detect_persons(frame).boxes if detector is not None
+             else np.array([[0, 0, frame.shape[1], frame.shape[0]]], dtype=np.int32))
+            for frame in clip_frames
+        ]
+
+    for count in person_counts:
+        # 1. 입력 준비: 사람 수별 합성 프레임
+        samples = [make_synthetic_frame(count, seed=i) for i in range(iterations)]
+        boxes_list = [boxes for _, boxes in samples]
+        model_samples = clip_samples if clip_samples else samples
+
+        stage_results = {}
+
+        if detector is not None:
+            stage_results["detector"] = measure(lambda s: detector.detect_persons(s[0]), model_samples)
+
+        if classifier is not None:
+            stage_results["classifier"] = measure(lambda s: classifier.classify_persons(*s), model_samples)
+            # 나이/성별 배치 추론: 사람 수만큼의 합성 얼굴 크롭 (얼굴 검출 결과와 무관하게 배치 경로를 측정)
+            if count > 0:
+                face_batches = [make_face_crops(count, seed=i) for i in range(iterations)]
+                stage_results["age_gender"] = measure(classifier._predict_age_gender_batch, face_batches)
+
+        # 트래커: 같은 사람들이 조금씩 움직이는 연속 프레임
+        rng = np.random.default_rng(0)
+        tracker = PersonTracker()
+        moving_boxes = [jitter_boxes(boxes_list[0], rng) for _ in range(iterations)]
+        stage_results["tracker"] = measure(tracker.update, moving_boxes)
+
+        # 집계기: 분석 프레임마다 인원수만큼의 그룹 코드 추가 + 조회
+        aggregator = DataAggregator()
+        code_lists = [(np.arange(count) + i) % NUM_DEMOGRAPHIC_CODES for i in range(iterations)]
+
+        def aggregate(codes):
+            aggregator.add_data(codes)
+            return aggregator.get_dominant_group_and_stats()
+        stage_results["aggregator"] = measure(aggregate, code_lists)
+
+        # 광고 선정: 집계 결과로 select_ad 호출
+        stats_list = [aggregate(codes) for codes in code_lists]
+        stage_results["selection"] = measure(
+            lambda r: ad_engine.select_ad(r[0], ["rainy_day", "morning_rush"], r[1]), stats_list)
+
+        stage_results["drawing"] = measure(
+            lambda s: draw_results(s[0], s[1], ["20s_female"] * len(s[1])), samples)
+
+        # 2. End-to-end: 감지 -> 트래킹 -> (N 프레임마다) 분류 -> 집계 -> 광고 선정 -> 그리기
+        # 감지는 비용만 측정하고 트래킹/분류는 샘플의 박스로 구동
+        # (합성 프레임은 정답 박스 - 만화 같은 사람에 대한 YOLO 결과는 무의미, 영상은 미리 계산한 같은 감지 결과)
+        e2e_tracker, e2e_aggregator = PersonTracker(), DataAggregator()
+
+        def end_to_end(indexed):
+            frame_index, (frame, person_boxes) = indexed
+            if detector is not None:
+                detector.detect_persons(frame)
+            tracks = e2e_tracker.update(person_boxes)
+            if classifier is not None and frame_index % settings.ANALYSIS_INTERVAL_FRAMES == 0:
+                pending = e2e_tracker.pending_classification(tracks)
+                if pending:
+                    results = classifier.classify_persons(frame, np.array([t.box for t in pending], dtype=np.int32))
+                    e2e_aggregator.add_data(e2e_tracker.apply_classification(pending, results))
+            dominant_group, stats_dict = e2e_aggregator.get_dominant_group_and_stats()
+            ad_engine.select_ad(dominant_group, [], stats_dict)
+            draw_results(frame, person_boxes, [t.display_label() for t in tracks])
+
+        e2e = measure(end_to_end, list(enumerate(model_samples)))
+        e2e["fps"] = e2e["throughput_per_sec"]
+        stage_results["end_to_end"] = e2e
+
+        results[str(count)] = stage_results
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    기준값 대비 p50/p95 지연 시간이 tolerance 비율 이상 늘어난 항목을 찾습니다.
+
+    Returns:
+        list: 회귀 항목 설명 문자열 리스트
+    """
+    regressions = []
+    for count, stages in results.items():
+        for stage, metrics in stages.items():
+            base = baseline.get("results", {}).get(count, {}).get(stage)
+            if base is None:
+                continue
+            for key in ("p50_ms", "p95_ms"):
+                limit = base[key] * (1 + tolerance)
+                if metrics[key] > limit and metrics[key] - base[key] > 0.05: # 0.05ms 미만 차이는 측정 노이즈로 간주
+                    regressions.append(
+                        f"{stage} @ {count} people: {key} {metrics[key]:.3f} ms > baseline {base[key]:.3f} ms (+{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmarks")
+    parser.add_argument("--people", type=int, nargs="+", default=[0, 5, 20, 50], help="프레임당 사람 수 목록")
+    parser.add_argument("--iterations", type=int, default=50, help="사람 수별 측정 프레임 수")
+    parser.add_argument("--clip", default=None, help="감지/분류/end-to-end 단계에 사용할 녹화 영상 (선택)")
+    parser.add_argument("--ads", type=int, default=10000, help="광고 선정 단계 카탈로그 크기")
+    parser.add_argument("--output", default="bench_output.json", help="결과 JSON 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 기준값 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 지연 증가 비율 (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", default=None, help="이번 결과를 기준값으로 저장할 경로")
+    args = parser.parse_args()
+
+    results = run(args.people, args.iterations, clip_path=args.clip, ads=args.ads)
+    report = {
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "iterations": args.iterations,
+        "results": results,
+    }
+
+    for count, stages in results.items():
+        print(f"--- {count} people ---")
+        for stage, m in stages.items():
+            print(f"{stage:<12} {m['throughput_per_sec']:10.1f}/s  p50 {m['p50_ms']:8.3f} ms  "
+                  f"p95 {m['p95_ms']:8.3f} ms  p99 {m['p99_ms']:8.3f} ms")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("PERFORMANCE REGRESSION:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+AdSelectionEngine 마이크로 벤치마크.
+10k 광고 카탈로그를 생성하여 select_ad 호출당 지연 시간을 측정합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.selection_benchmark --ads 10000
+"""
+import argparse
+import random
+import time
+
+from config import settings
+from src.logic.selection_engine import AdSelectionEngine
+
+DEMOGRAPHIC_TAGS = ["20s_female", "20s_male", "30-50s_female", "30-50s_male"]
+CONTEXT_TAGS = ["morning_rush", "lunch_time", "evening_rush", "night_time", "day_time",
+                "rainy_day", "snowy_day", "sunny_day", "cloudy_day"]
+
+
+def make_catalogue(num_ads, seed=0):
+    """태그가 무작위로 붙은 가상 광고 카탈로그를 생성합니다."""
+    rng = random.Random(seed)
+    extra_tags = [f"tag_{i}" for i in range(200)]
+    ad_db = {}
+    for i in range(num_ads):
+        tags = rng.sample(extra_tags, 3)
+        if rng.random() < 0.05:
+            tags.append(rng.choice(DEMOGRAPHIC_TAGS))
+        if rng.random() < 0.05:
+            tags.append(rng.choice(CONTEXT_TAGS))
+        if rng.random() < 0.01:
+            tags.append("all")
+        ad_db[f"ad{i:06d}"] = {"file_path": f"assets/ads/ad{i:06d}.mp4", "tags": tags, "weight": rng.random()}
+    return ad_db
+
+
+def linear_find_ad_by_tag(ad_db, tag):
+    """색인 도입 이전의 선형 탐색 (비교 기준)"""
+    for ad_id, ad_info in ad_db.items():
+        if tag in ad_info["tags"]:
+            return ad_info["file_path"]
+    return None
+
+
+def time_per_call(fn, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(*query)
+    return (time.perf_counter() - start) / (repeat * len(queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AdSelectionEngine micro-benchmark")
+    parser.add_argument("--ads", type=int, default=10000, help="카탈로그 광고 수")
+    parser.add_argument("--repeat", type=int, default=20, help="쿼리 세트 반복 횟수")
+    args = parser.parse_args()
+
+    ad_db = make_catalogue(args.ads)
+
+    start = time.perf_counter()
+    engine = AdSelectionEngine(ad_db)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(1)
+    queries = []
+    for _ in range(100):
+        stats = {tag: rng.randint(1, 20) for tag in rng.sample(DEMOGRAPHIC_TAGS, 2)}
+        dominant = max(stats, key=stats.get)
+        queries.append((dominant, rng.sample(CONTEXT_TAGS, 2), stats))
+
+    def linear_select(dominant_group, context_tags, stats_dict):
+        for tag in (dominant_group, *context_tags, "all"):
+            ad_path = linear_find_ad_by_tag(ad_db, tag)
+            if ad_path:
+                return ad_path
+        return None
+
+    results = {}
+    results["linear scan (baseline)"] = time_per_call(linear_select, queries, args.repeat)
+    for mode in ("priority", "scored"):
+        settings.AD_SELECTION_MODE = mode
+        results[f"indexed {mode}"] = time_per_call(engine.select_ad, queries, args.repeat)
+
+    print(f"catalogue: {args.ads} ads, index build: {build_ms:.1f} ms")
+    for name, seconds in results.items():
+        print(f"{name:<24} {seconds * 1e6:10.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
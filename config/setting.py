@@ -8,6 +8,28 @@ AGE_MODEL = "models/age_net.caffemodel"
 GENDER_PROTO = "models/gender_deploy.prototxt"
 GENDER_MODEL = "models/gender_net.caffemodel"
 
+# 추론 백엔드: "default" (ultralytics/torch + OpenCV DNN) / "onnxruntime" / "openvino" (모두 CPU)
+# onnxruntime/openvino는 tools/export_models.py로 만든 변환 모델을 사용하며, 없는 모델은 default로 대체
+INFERENCE_BACKEND = "default"
+# 변환 모델 정밀도: "fp32" / "int8" (int8은 benchmarks/compare_backends.py로 fp32 대비 mAP를 확인한 뒤 사용)
+INFERENCE_PRECISION = "fp32"
+INFERENCE_NUM_THREADS = 0 # 백엔드 런타임의 스레드 수 (0이면 런타임 기본값)
+YOLO_INPUT_SIZE = 640 # 변환 YOLO 모델의 고정 입력 해상도 (배치 1 고정 그래프)
+MODEL_EXPORT_DIR = "models/exported"
+# {precision}은 INFERENCE_PRECISION으로 채워짐
+ONNX_MODEL_PATHS = {
+    "person": "models/exported/yolov8n_{precision}.onnx",
+    "face": "models/exported/face_detector_{precision}.onnx",
+    "age": "models/exported/age_net_{precision}.onnx",
+    "gender": "models/exported/gender_net_{precision}.onnx",
+}
+OPENVINO_MODEL_PATHS = {
+    "person": "models/exported/yolov8n_{precision}.xml",
+    "face": "models/exported/face_detector_{precision}.xml",
+    "age": "models/exported/age_net_{precision}.xml",
+    "gender": "models/exported/gender_net_{precision}.xml",
+}
+
 # 데모 영상 경로
 DEMO_VIDEO_PATH = "assets/videos/street_demo.mp4"
 
@@ -17,6 +39,100 @@ DEMO_VIDEO_PATH = "assets/videos/street_demo.mp4"
 # 날씨 API
 WEATHER_API_KEY = "YOUR_OPENWEATHERMAP_API_KEY" # [TODO]
 LOCATION_CITY = "Seoul"
+WEATHER_API_URL = "http://api.openweathermap.org/data/2.5/weather" # 테스트 시 로컬 스텁 서버 주소로 변경 가능
+WEATHER_REFRESH_TTL_SEC = 600 # 10분(600초)마다 백그라운드에서 날씨 갱신
+WEATHER_REQUEST_TIMEOUT_SEC = 5
+WEATHER_BACKOFF_BASE_SEC = 30 # API 오류 시 첫 재시도 대기 시간 (이후 2배씩 증가)
+WEATHER_BACKOFF_MAX_SEC = 1800 # 재시도 대기 시간 상한
+WEATHER_FALLBACK_TAG = "default_weather" # 첫 갱신 성공 전까지 사용할 날씨 태그
 
 # 집계 설정
-AGGREGATION_WINDOW_SIZE = 30 # 30프레임 (약 1초) 동안 데이터 집계
\ No newline at end of file
+AGGREGATION_WINDOW_SIZE = 30 # "frames" 모드에서 집계할 최근 add_data 횟수 (실시간 파이프라인에서는 최근 30번의 분류 결과)
+AGGREGATION_MODE = "frames" # "frames" (최근 N번의 분류 결과) / "time" (최근 N 초) / "decay" (지수 감쇠)
+AGGREGATION_WINDOW_SEC = 60 # "time" 모드의 윈도우 길이 (초)
+AGGREGATION_HALF_LIFE_SEC = 30 # "decay" 모드의 반감기 (초)
+
+# 분류기 설정
+CLASSIFIER_MAX_BATCH_SIZE = 16 # 나이/성별 네트워크 한 번의 forward에 넣을 최대 얼굴 수 (1이면 얼굴별 추론)
+# 얼굴 검출 방식: "per_person" (YOLO 박스마다 검출) / "full_frame" (프레임 전체에서 한 번 검출 후 사람 박스에 매칭)
+FACE_DETECTION_MODE = "per_person"
+FACE_DETECTION_TILES = (1, 1) # full_frame 모드에서 프레임을 나눌 타일 수 (행, 열)
+FACE_TILE_OVERLAP = 0.1 # 타일 경계에 걸친 얼굴을 놓치지 않기 위한 타일 간 겹침 비율
+
+# 트래커 설정
+TRACKER_IOU_THRESHOLD = 0.3 # 이전 트랙과 같은 사람으로 볼 최소 IoU
+TRACKER_MAX_MISSED = 15 # 이 프레임 수 이상 보이지 않으면 트랙 제거
+TRACK_MIN_CONFIDENCE = 0.5 # 이 신뢰도 미만이면 다음 분석 때 재분류
+TRACK_MAX_CLASSIFY_ATTEMPTS = 3 # 트랙당 최대 분류 시도 횟수
+
+# 파이프라인 설정
+ANALYSIS_INTERVAL_FRAMES = 10 # 오프라인 분석/벤치마크: 10 프레임마다 한 번씩 무거운 분석(연령/성별) 요청 (실시간 파이프라인은 아래 적응형 스케줄러 사용)
+PIPELINE_QUEUE_SIZE = 2 # 캡처 -> 감지 단계 큐 크기 (가득 차면 가장 오래된 프레임을 버림)
+PIPELINE_MAX_LATENCY_SEC = 0.5 # 캡처 후 이 시간이 지난 프레임은 감지하지 않고 버림
+
+# 멀티 카메라 설정 (모든 소스가 하나의 YOLO 모델을 공유하며 배치 추론)
+VIDEO_SOURCES = [DEMO_VIDEO_PATH] # 파일 경로, 카메라 인덱스(0, 1, ...), RTSP URL 등
+DETECTOR_BATCH_WAIT_SEC = 0.01 # 여러 스트림의 프레임을 한 배치로 모으기 위해 기다리는 최대 시간
+
+# 광고 선정 설정
+AD_SELECTION_MODE = "priority" # "priority" (군중 > Context > 기본 순) / "scored" (점수 기반)
+AD_SCORE_CROWD_WEIGHT = 1.0 # scored 모드: 광고 태그에 해당하는 군중 비율 가중치
+AD_SCORE_CONTEXT_WEIGHT = 0.5 # scored 모드: 일치하는 Context 태그 1개당 가중치
+AD_SCORE_AD_WEIGHT = 0.1 # scored 모드: 광고별 "weight" 값 가중치
+
+# 움직임 게이트 설정 (정적인 장면에서는 YOLO를 건너뛰고 이전 감지 결과를 재사용)
+MOTION_GATE_ENABLED = True
+MOTION_GATE_WIDTH = 160 # 프레임 비교용 축소 폭 (픽셀)
+MOTION_PIXEL_THRESHOLD = 25 # 이 값 이상 밝기가 변한 픽셀을 '변화'로 간주
+MOTION_GATE_THRESHOLD = 0.002 # 변화 픽셀 비율이 이 값 미만이면 감지를 건너뜀
+MOTION_GATE_MAX_SKIP = 30 # 연속으로 건너뛸 수 있는 최대 프레임 수 (이후 강제 감지)
+
+# 계측(메트릭) 설정
+METRICS_ENABLED = False # 비활성화 시 계측 오버헤드는 거의 없음
+METRICS_WINDOW = 1000 # 단계별 롤링 히스토그램에 유지할 최근 샘플 수
+METRICS_HTTP_PORT = 9108 # 로컬 Prometheus 텍스트 엔드포인트 포트 (http://127.0.0.1:9108/metrics, None이면 비활성화)
+METRICS_LOG_INTERVAL_SEC = 60 # 요약 로그 출력 주기 (0이면 비활성화)
+
+# 화면 표시 설정 (분석 속도와 별개로 브라우저 전송량 제한)
+DISPLAY_FPS = 15 # 분석 영상 최대 표시 FPS
+DISPLAY_MAX_WIDTH = 960 # 미리보기 최대 폭 (픽셀, 이보다 큰 프레임은 축소)
+DISPLAY_JPEG_QUALITY = 80 # 미리보기 JPEG 품질
+
+# 시작 속도 설정
+MODEL_CACHE_DIR = "models/cache" # 최적화/컴파일된 모델 캐시 경로 (다음 부팅 시 변환 단계 생략)
+MODEL_WARMUP = True # 모델 로드 후 더미 입력으로 워밍업 추론 실행
+
+# 분석 데이터 저장 설정 (광고주 리포트용 시간/일 단위 롤업)
+ANALYTICS_ENABLED = True
+ANALYTICS_DB_PATH = "data/analytics.db" # 로컬 SQLite 파일 경로
+ANALYTICS_SAMPLE_INTERVAL_SEC = 5 # 스트림별 집계 스냅샷 기록 간격
+ANALYTICS_FLUSH_INTERVAL_SEC = 10 # 버퍼를 DB에 일괄 기록하는 주기
+ANALYTICS_RAW_RETENTION_DAYS = 7 # 원본 샘플 보존 기간 (롤업은 계속 유지, 0이면 삭제 안 함)
+
+# 광고 송출 스케줄러 설정 (광고 전환 빈도 제한)
+AD_SCHEDULER_EVAL_INTERVAL_SEC = 1.0 # 광고 선정 엔진 재평가 주기
+AD_MIN_DWELL_SEC = 15 # 광고 하나의 최소 송출 시간
+AD_SWITCH_PERSIST_SEC = 3 # 새 후보 광고가 이 시간 동안 계속 선정되어야 전환 (히스테리시스)
+AD_MAX_PLAYS_PER_HOUR = 12 # 같은 광고를 1시간 동안 새로 송출할 수 있는 최대 횟수 (0이면 제한 없음)
+AD_PRELOAD_CACHE_SIZE = 4 # 미리 읽어 둘 광고 영상 수
+
+# 프로세스 분리 추론 설정 (감지/분류 모델을 UI와 다른 프로세스에서 실행)
+INFERENCE_WORKERS = False # True이면 감지기/분류기를 각각 워커 프로세스에서 실행
+WORKER_NUM_THREADS = 0 # 워커 프로세스별 연산 스레드 수 (0이면 CPU 코어 수의 절반)
+WORKER_RING_SLOTS = 8 # 공유 메모리 링 버퍼 슬롯 수 (한 요청의 최대 프레임 수보다 크거나 같게)
+WORKER_TIMEOUT_SEC = 10 # 이 시간 안에 응답이 없으면 워커를 재시작
+WORKER_START_TIMEOUT_SEC = 120 # 워커의 모델 로드 + 워밍업 대기 시간
+
+# 적응형 분석 스케줄러 설정 (실시간 파이프라인의 연령/성별 분류 시점/대상 결정)
+ANALYSIS_CPU_BUDGET = 0.5 # 분류에 사용할 CPU 시간 비율 (1.0 = 코어 하나를 계속 사용)
+ANALYSIS_BURST_SEC = 0.5 # 적립해 둘 수 있는 최대 분류 시간 (새 인원이 몰릴 때 한 번에 처리 가능한 양)
+ANALYSIS_MAX_JOB_SEC = 0.15 # 분류 요청 한 번의 목표 최대 처리 시간 (초과하지 않도록 인원수 제한)
+ANALYSIS_INITIAL_COST_SEC = 0.02 # 측정 전 1인당 분류 시간 추정치
+ANALYSIS_COST_EMA_ALPHA = 0.2 # 1인당 분류 시간 EMA 계수
+ANALYSIS_RETRY_INTERVAL_SEC = 1.0 # 재분류(신뢰도 낮음/얼굴 미검출)만 남았을 때의 최소 시도 간격
+ANALYSIS_SCENE_CHANGE_RATIO = 0.02 # 변화 픽셀 비율이 이 값 이상이면 간격과 무관하게 재분류 시도
+
+# 광고 DB 설정 (실행 중 파일을 수정하면 자동으로 다시 로드)
+AD_DB_PATH = "config/ad_db.json" # 일반 형식 또는 압축 형식(compact-v1) JSON
+AD_DB_WATCH_INTERVAL_SEC = 2.0 # 광고 DB 파일 변경 확인 주기 (0이면 감시 안 함)
+AD_EXTRA_TAGS = ["college", "office"] # 인구통계/Context 태그 외에 광고에 허용할 태그 (목록에 없는 태그가 있는 광고는 거부)
@@ -1,42 +1,69 @@
 import streamlit as st
-import cv2
-import numpy as np
 import time 
 
 # 설정 파일
 from config import settings
 
 # 헬퍼 모듈 임포트
-from src.analysis.detector import PersonDetector
-from src.analysis.classifier import DemographicClassifier
-from src.analysis.aggregator import DataAggregator
-from src.context.weather_manager import get_weather_context
-from src.context.time_manager import get_time_context
+# [수정] 감지/분류 모델은 BackgroundModelLoader가 백그라운드에서 임포트/로드 (빠른 시작)
+from src.context.context_provider import ContextProvider
 from src.logic.ad_database import load_ad_database
 from src.logic.selection_engine import AdSelectionEngine
-from src.utils.drawing import draw_results
+from src.logic.catalogue_watcher import AdCatalogueWatcher
+from src.logic.analytics_store import AnalyticsStore
+from src.logic.ad_scheduler import AdPreloader, AdScheduler
+from src.utils.display import StreamDisplay
+from src.pipeline.analysis_pipeline import AnalysisPipeline
+from src.pipeline.model_loader import BackgroundModelLoader
+from src.utils.metrics import metrics
+
+# [추가] 서버 프로세스 시작 시각 (첫 프레임/첫 분류까지 걸린 시간 측정 기준)
+@st.cache_resource
+def get_boot_time():
+    return time.perf_counter()
 
 # @st.cache_resource: 모델처럼 무거운 객체를 로드할 때 사용
+# [수정] 모델 로드/워밍업은 백그라운드 스레드에서 진행하고, 영상은 그동안 바로 표시
 @st.cache_resource
 def load_models():
-    """AI 모델을 로드하고 캐시합니다."""
-    detector = PersonDetector()
-    classifier = DemographicClassifier()
-    return detector, classifier
-
-# @st.cache_data: DB, API 호출 등 데이터 자체를 캐시할 때 사용
-@st.cache_data
-def load_data():
-    """광고 DB를 로드하고 캐시합니다."""
-    ad_db = load_ad_database("config/ad_db.json")
-    return ad_db
-
-@st.cache_data
-def fetch_context():
-    """외부 컨텍스트(날씨, 시간)를 가져옵니다."""
-    time_tag = get_time_context()
-    weather_tag = get_weather_context(settings.WEATHER_API_KEY, settings.LOCATION_CITY)
-    return [time_tag, weather_tag] # 태그 리스트로 반환
+    """AI 모델 로더를 시작하고 캐시합니다."""
+    return BackgroundModelLoader().start()
+
+# [수정] 광고 DB는 선정 엔진과 함께 캐시하고, 파일이 바뀌면 감시 스레드가 재시작 없이 엔진의 카탈로그를 교체
+@st.cache_resource
+def load_ad_engine():
+    """광고 DB를 로드하여 선정 엔진을 만들고, 광고 DB 감시를 시작합니다."""
+    ad_db = load_ad_database(settings.AD_DB_PATH)
+    ad_engine = AdSelectionEngine(ad_db)
+    AdCatalogueWatcher(settings.AD_DB_PATH, ad_engine).start()
+    return ad_engine
+
+# [수정] 컨텍스트는 백그라운드 스레드가 TTL마다 갱신하므로 프레임 루프는 네트워크를 기다리지 않음
+@st.cache_resource
+def load_context_provider():
+    """외부 컨텍스트(날씨, 시간) 제공자를 시작하고 캐시합니다."""
+    return ContextProvider(settings.WEATHER_API_KEY, settings.LOCATION_CITY).start()
+
+
+# [추가] 광고주 리포트용 분석 데이터 저장소 (기록은 백그라운드 스레드에서 일괄 처리)
+@st.cache_resource
+def load_analytics_store():
+    """분석 데이터 저장소를 시작하고 캐시합니다."""
+    if not settings.ANALYTICS_ENABLED:
+        return None
+    return AnalyticsStore(settings.ANALYTICS_DB_PATH).start()
+
+
+@st.cache_resource
+def start_metrics_exporters():
+    """계측이 켜져 있으면 /metrics 엔드포인트와 주기적 로그를 (서버당 한 번) 시작합니다."""
+    if not metrics.enabled:
+        return None
+    if settings.METRICS_HTTP_PORT:
+        metrics.start_http_server(settings.METRICS_HTTP_PORT)
+    if settings.METRICS_LOG_INTERVAL_SEC:
+        metrics.start_log_reporter(settings.METRICS_LOG_INTERVAL_SEC)
+    return metrics
 
 
 # --- 2. 객체 생성 ---
@@ -44,122 +71,112 @@ st.set_page_config(layout="wide", page_title="Smart Ad Demo")
 st.title("🤖 실시간 유동인구 분석 기반 옥외광고 데모")
 
 # 모델, 데이터 로드
-detector, classifier = load_models()
-ad_db = load_data()
+boot_time = get_boot_time()
+model_loader = load_models()
+ad_engine = load_ad_engine()
+context_provider = load_context_provider()
+analytics_store = load_analytics_store()
+start_metrics_exporters()
 # [수정] context_tags는 루프 내에서 초기화되므로 여기서 호출 제거
 
 # 로직 객체 생성
-ad_engine = AdSelectionEngine(ad_db)
-aggregator = DataAggregator() # 데이터 집계기
+# [추가] 광고 전환 시점은 스케줄러가 결정 (최소 송출 시간, 빈도 제한, 히스테리시스), 다음 광고는 미리 읽어 둠
+ad_preloader = AdPreloader()
+# [수정] 집계기/트래커는 스트림(카메라)마다 파이프라인 내부에서 생성
+# [수정] 모델 없이 먼저 시작하고, 로드가 끝나면 루프에서 연결
+pipeline = AnalysisPipeline(settings.VIDEO_SOURCES, boot_time=boot_time)
 
 # --- 3. Streamlit UI 레이아웃 설정 ---
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.header("실시간 분석 영상")
-    # 비디오 프레임이 출력될 자리
-    video_placeholder = st.empty()
-
-with col2:
-    st.header("대시보드")
-    
-    # Context 정보
-    with st.container(border=True):
-        st.subheader("Context")
-        # [수정] 동적 갱신을 위해 st.info 대신 placeholder 사용
-        context_placeholder = st.empty()
-    
-    # 통계 정보
-    with st.container(border=True):
-        st.subheader(f"Crowd Stats (Recent {settings.AGGREGATION_WINDOW_SIZE} frames)")
-        # 실시간 차트가 그려질 자리
-        stats_placeholder = st.empty()
-    
-    # 광고 송출
-    with st.container(border=True):
-        st.subheader("광고 송출")
-        # 선정 이유가 표시될 자리
-        ad_reason_placeholder = st.empty()
-        # 광고 영상이 출력될 자리
-        ad_video_placeholder = st.empty()
+# Context 정보 (모든 스트림 공통)
+with st.container(border=True):
+    st.subheader("Context")
+    # [수정] 동적 갱신을 위해 st.info 대신 placeholder 사용
+    context_placeholder = st.empty()
+
+# [추가] 스트림(카메라)마다 영상 + 대시보드 영역을 생성
+stream_views = {}
+for stream in pipeline.streams:
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.header(f"실시간 분석 영상 (Camera {stream.stream_id})")
+        # 비디오 프레임이 출력될 자리
+        video_placeholder = st.empty()
+
+    with col2:
+        st.header("대시보드")
+
+        # 통계 정보
+        with st.container(border=True):
+            st.subheader(f"Crowd Stats ({stream.aggregator.window_description()})")
+            # 실시간 차트가 그려질 자리
+            stats_placeholder = st.empty()
+
+        # 광고 송출
+        with st.container(border=True):
+            st.subheader("광고 송출")
+            # 선정 이유가 표시될 자리
+            ad_reason_placeholder = st.empty()
+            # 광고 영상이 출력될 자리
+            ad_video_placeholder = st.empty()
+
+    # [수정] 위젯 갱신은 표시 계층이 담당 (FPS 제한, 값이 바뀔 때만 갱신)
+    stream_views[stream.stream_id] = StreamDisplay(video_placeholder, stats_placeholder, ad_reason_placeholder, ad_video_placeholder)
+ad_schedulers = {stream.stream_id: AdScheduler(ad_engine, ad_preloader) for stream in pipeline.streams}
 
 # --- 4. 비디오 스트리밍 및 추론 루프 ---
-cap = cv2.VideoCapture(settings.DEMO_VIDEO_PATH)
-
-# 광고 상태를 저장하여 동일한 광고가 반복 재생되지 않도록 함
-current_ad_path = None
+# [수정] 캡처/감지/분류는 파이프라인 워커 스레드에서 실행하고, 메인 스레드는 최신 결과만 화면에 그림
+pipeline.start()
 
 # [추가] 루프 상태 관리 변수
-frame_counter = 0
-CONTEXT_REFRESH_INTERVAL_SEC = 600 # 10분(600초)마다 컨텍스트 갱신
-ANALYSIS_INTERVAL_FRAMES = 10      # 10 프레임마다 한 번씩 무거운 분석 수행
-
-last_context_fetch_time = 0
 context_tags = []
-cached_boxes = []         # 시각적 일관성을 위한 박스 캐시
-cached_demographics = []  # 시각적 일관성을 위한 인구통계 캐시
-
-while cap.isOpened():
-    current_time = time.time()
-
-    # [추가] 1. 컨텍스트 갱신 로직 (10분에 한 번 또는 첫 프레임)
-    if (current_time - last_context_fetch_time) > CONTEXT_REFRESH_INTERVAL_SEC or frame_counter == 0:
-        context_tags = fetch_context()
-        last_context_fetch_time = current_time
-        # [수정] placeholder를 사용하여 UI 갱신
-        context_placeholder.info(f"시간: **{context_tags[0]}** |  날씨: **{context_tags[1]}**")
-
-    # 2. 프레임 읽기
-    ret, frame = cap.read()
-    if not ret:
-        # 영상이 끝나면 처음부터 다시 재생 (데모용 루프)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        frame_counter = 0 # 프레임 카운터 리셋
-        aggregator.queue.clear() # 집계기 리셋
-        continue
-
-    # 3. [AI] 사람 감지 (YOLO) - (매 프레임 실행, 가벼움)
-    person_boxes = detector.detect_persons(frame)
-    
-    # 4. [AI] 연령/성별 분류 (CNN) - (N 프레임마다 실행, 무거움)
-    if frame_counter % ANALYSIS_INTERVAL_FRAMES == 0:
-        # 무거운 분석 수행
-        cached_demographics = classifier.classify_demographics(frame, person_boxes)
-        # 분석 시점의 박스를 캐시 (시각적 일관성)
-        cached_boxes = person_boxes 
-        
-        # 5. [Logic] 데이터 집계 - (분석된 프레임만 집계기에 추가)
-        aggregator.add_data(cached_demographics)
-
-    # 6. [Logic] 광고 선정 - (집계 결과는 매 프레임 확인)
-    dominant_group, stats_dict = aggregator.get_dominant_group_and_stats()
-    selected_ad_path, reason = ad_engine.select_ad(dominant_group, context_tags)
-
-    # 7. [UI] 결과 시각화
-    
-    # 7-1. 분석 영상 업데이트 (캐시된 박스/결과 사용)
-    # 참고: person_boxes 대신 cached_boxes를 사용해야 레이블과 박스 개수가 일치함
-    output_frame = draw_results(frame, cached_boxes, cached_demographics)
-    video_placeholder.image(output_frame, channels="BGR", use_column_width=True)
-    
-    # 7-2. 통계 대시보드 업데이트
-    if stats_dict:
-        stats_placeholder.bar_chart(stats_dict)
-    else:
-        stats_placeholder.write("Detecting crowd...")
-
-    # 7-3. 광고 화면 업데이트
-    ad_reason_placeholder.info(f"선정 이유: **{reason}**")
-    
-    # 광고가 바뀌었을 때만 비디오를 새로 로드
-    if selected_ad_path and selected_ad_path != current_ad_path:
-        current_ad_path = selected_ad_path
-        ad_video_placeholder.video(current_ad_path, loop=True, autoplay=True, muted=True)
-    elif not selected_ad_path:
-        ad_video_placeholder.empty() # 송출할 광고가 없으면 비움
-        current_ad_path = None
-        
-    # 프레임 카운터 증가
-    frame_counter += 1
-
-cap.release()
\ No newline at end of file
+seen_versions = {} # 스트림별로 마지막으로 화면에 그린 결과 버전
+models_attached = False
+
+try:
+    while pipeline.is_running():
+        # [추가] 0. 백그라운드 모델 로드가 끝나면 파이프라인에 연결
+        if not models_attached and model_loader.is_ready():
+            models_attached = True
+            # 로드에 실패한 모델은 None으로 연결 (감지기가 없으면 원본 프레임만, 분류기가 없으면 분류 없이 트래킹만)
+            pipeline.attach_models(model_loader.detector, model_loader.classifier)
+
+        # [수정] 1. 컨텍스트 조회 (I/O 없음, 값이 바뀌었을 때만 UI 갱신)
+        latest_context_tags = context_provider.get_context_tags()
+        if latest_context_tags != context_tags:
+            context_tags = latest_context_tags
+            # [수정] placeholder를 사용하여 UI 갱신
+            context_placeholder.info(f"시간: **{context_tags[0]}** |  날씨: **{context_tags[1]}**")
+
+        # 2. 파이프라인에서 갱신된 스트림의 최신 결과 가져오기 (감지 + 트래킹 완료된 프레임)
+        for stream_id, version, packet in pipeline.wait_for_updates(seen_versions):
+            seen_versions[stream_id] = version
+            view = stream_views[stream_id]
+
+            # 3. [Logic] 광고 선정 - (스트림별 집계 결과로 결정)
+            with metrics.span("aggregation"):
+                dominant_group, stats_dict = pipeline.get_crowd_stats(stream_id)
+            # [수정] 매 프레임 재선정 대신 스케줄러가 전환 여부를 판단 (대부분의 틱은 현재 광고를 그대로 반환)
+            with metrics.span("ad_selection"):
+                selected_ad_path, reason, _ = ad_schedulers[stream_id].tick(dominant_group, context_tags, stats_dict)
+
+            # 4. [UI] 결과 시각화
+
+            # 4-1. 분석 영상 업데이트 (목표 표시 FPS에 맞춰 건너뜀, 현재 박스 + 트랙 레이블 사용)
+            # [수정] 레이블 문자열은 화면에 그릴 때만 코드에서 변환
+            if view.frame_due():
+                view.show_frame(packet.frame, packet.detections.boxes, packet.detections.labels())
+
+            # 4-2. 통계 대시보드 업데이트 (값이 바뀌었을 때만)
+            view.show_stats(stats_dict)
+
+            # 4-3. 광고 화면 업데이트 (광고/선정 이유가 바뀌었을 때만)
+            if view.show_ad(selected_ad_path, reason, ad_preloader.get(selected_ad_path)):
+                metrics.inc("ad_switches")
+
+            # [추가] 5. 집계 결과/Context/송출 광고 기록 (샘플 간격마다 버퍼에만 추가, DB 쓰기는 백그라운드)
+            if analytics_store is not None:
+                analytics_store.record(stream_id, stats_dict, context_tags, view.current_ad_path)
+finally:
+    # Streamlit 재실행/종료 시 워커 스레드 정리
+    pipeline.stop()
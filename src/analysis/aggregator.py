@@ -1,23 +1,73 @@
-from collections import deque, Counter
+import math
+import time
+from collections import deque
+
+import numpy as np
 from config import settings
+from src.analysis.results import DEMOGRAPHIC_TAGS, NUM_DEMOGRAPHIC_CODES
 
 class DataAggregator:
     """
-    최근 N 프레임 동안의 인구 통계 데이터를 집계하여
+    최근 인구 통계 데이터를 집계하여
     가장 많은 그룹(dominant group)과 전체 통계를 계산합니다.
+
+    그룹 코드별 누적 개수 배열을 유지하여 add_data 시 np.bincount 결과를 더하고, 윈도우에서 빠질 때 빼므로
+    조회 비용이 윈도우 크기와 무관합니다. 문자열 태그는 조회 결과(stats_dict)에서만 만듭니다.
+    집계 방식은 AGGREGATION_MODE로 선택합니다.
+    - "frames": 최근 AGGREGATION_WINDOW_SIZE 번의 add_data (기존 방식)
+                실시간 파이프라인은 분류 결과가 나올 때만 add_data를 호출하므로 프레임 수가 아니라 분류 횟수 기준
+    - "time":   최근 AGGREGATION_WINDOW_SEC 초 (처리 속도와 무관한 실제 시간 윈도우)
+    - "decay":  반감기 AGGREGATION_HALF_LIFE_SEC 초의 지수 감쇠 가중 합
     """
-    def __init__(self):
-        # 설정 파일에서 정의한 윈도우 크기만큼 큐를 생성
-        self.queue = deque(maxlen=settings.AGGREGATION_WINDOW_SIZE)
+    def __init__(self, mode=None):
+        self.mode = mode or settings.AGGREGATION_MODE
+        # 설정 파일에서 정의한 윈도우 크기만큼 큐를 생성 ("time" 모드는 시간으로 제거하므로 무제한)
+        maxlen = settings.AGGREGATION_WINDOW_SIZE if self.mode == "frames" else None
+        self.queue = deque(maxlen=maxlen) # (timestamp, 그룹 코드별 개수 배열)
+
+        self.counts = self._zero_counts() # 윈도우 내 그룹 코드별 누적 개수 (인덱스 = 코드)
+        self._cached_result = None # 윈도우가 바뀔 때까지 재사용할 (dominant_group, stats_dict)
+        self._last_decay_time = None
+
+    def reset(self):
+        """집계 상태를 모두 초기화합니다. (영상 루프 재시작 시)"""
+        self.queue.clear()
+        self.counts = self._zero_counts()
+        self._cached_result = None
+        self._last_decay_time = None
 
-    def add_data(self, demographics_list):
+    def _zero_counts(self):
+        return np.zeros(NUM_DEMOGRAPHIC_CODES, dtype=np.float64 if self.mode == "decay" else np.int64)
+
+    def add_data(self, demographic_codes, timestamp=None):
         """
-        현재 프레임에서 감지된 인구 통계 리스트(e.g., ["20s_female", "40s_male"])를
+        현재 프레임에서 분류된 인구통계 그룹 코드 배열(results.DEMOGRAPHIC_TAGS의 인덱스)을
         큐에 추가합니다.
+
+        Args:
+            demographic_codes (np.array): 그룹 코드 배열 (UNKNOWN_CODE는 무시)
+            timestamp (float): 데이터 시각 (기본값: time.monotonic())
         """
-        self.queue.append(demographics_list)
+        now = time.monotonic() if timestamp is None else timestamp
+        # UNKNOWN_CODE(-1)를 0번 칸으로 밀어 한 번의 bincount로 세고 버림
+        codes = np.asarray(demographic_codes, dtype=np.intp)
+        frame_counts = np.bincount(codes + 1, minlength=NUM_DEMOGRAPHIC_CODES + 1)[1:]
+
+        if self.mode == "decay":
+            self._apply_decay(now)
+            self.counts += frame_counts
+        else:
+            # 큐가 가득 찼으면 밀려날 가장 오래된 항목을 먼저 차감
+            if self.queue.maxlen is not None and len(self.queue) == self.queue.maxlen:
+                self.counts -= self.queue[0][1]
+            self.queue.append((now, frame_counts))
+            self.counts += frame_counts
+            if self.mode == "time":
+                self._evict_expired(now)
 
-    def get_dominant_group_and_stats(self):
+        self._cached_result = None
+
+    def get_dominant_group_and_stats(self, timestamp=None):
         """
         큐에 쌓인 모든 데이터를 취합하여 가장 많은 그룹과
         전체 통계 딕셔너리를 반환합니다.
@@ -26,16 +76,47 @@ class DataAggregator:
             tuple: (dominant_group, stats_dict)
                    e.g., ("20s_female", {"20s_female": 15, "40s_male": 8})
         """
-        # 큐 안의 2D 리스트를 1D 리스트로 평탄화
-        flat_list = [item for sublist in self.queue for item in sublist]
-
-        if not flat_list:
-            return None, {}  # (dominant_group, stats_dict)
-
-        # Counter를 사용하여 각 항목의 개수를 셈
-        stats = Counter(flat_list)
-        
-        # 가장 많이 등장한 항목(dominant group)을 찾음
-        dominant_group = stats.most_common(1)[0][0]
-        
-        return dominant_group, dict(stats)
\ No newline at end of file
+        now = time.monotonic() if timestamp is None else timestamp
+
+        if self.mode == "time" and self._evict_expired(now):
+            self._cached_result = None
+        elif self.mode == "decay":
+            self._apply_decay(now)
+            self._cached_result = None
+
+        if self._cached_result is None:
+            # 문자열 태그는 UI/광고 DB로 넘기는 이 시점에만 생성 (그룹 수가 적으므로 리스트로 변환해 처리)
+            counts = self.counts.tolist()
+            stats_dict = {DEMOGRAPHIC_TAGS[code]: count for code, count in enumerate(counts) if count}
+            if not stats_dict:
+                self._cached_result = (None, {})  # (dominant_group, stats_dict)
+            else:
+                # 가장 많이 등장한 그룹(dominant group)을 찾음 (동점이면 코드가 작은 그룹)
+                dominant_group = DEMOGRAPHIC_TAGS[max(range(len(counts)), key=counts.__getitem__)]
+                self._cached_result = (dominant_group, stats_dict)
+
+        return self._cached_result
+
+    def window_description(self):
+        """대시보드에 표시할 집계 윈도우 설명"""
+        if self.mode == "time":
+            return f"Recent {settings.AGGREGATION_WINDOW_SEC} s"
+        if self.mode == "decay":
+            return f"Half-life {settings.AGGREGATION_HALF_LIFE_SEC} s"
+        return f"Recent {settings.AGGREGATION_WINDOW_SIZE} analyses"
+
+    def _evict_expired(self, now):
+        """시간 윈도우를 벗어난 항목을 제거합니다. 제거된 항목이 있으면 True"""
+        evicted = False
+        while self.queue and now - self.queue[0][0] > settings.AGGREGATION_WINDOW_SEC:
+            self.counts -= self.queue.popleft()[1]
+            evicted = True
+        return evicted
+
+    def _apply_decay(self, now):
+        """마지막 감쇠 이후 경과 시간만큼 모든 누적 값을 지수적으로 감쇠시킵니다."""
+        if self._last_decay_time is not None and now > self._last_decay_time:
+            factor = math.pow(0.5, (now - self._last_decay_time) / settings.AGGREGATION_HALF_LIFE_SEC)
+            self.counts *= factor
+            self.counts[self.counts < 0.01] = 0.0 # 사실상 0이 된 그룹은 통계에서 제외
+        self._last_decay_time = now
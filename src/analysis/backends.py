@@ -0,0 +1,236 @@
+import hashlib
+import os
+
+import cv2
+import numpy as np
+from config import settings
+from src.analysis.results import PersonDetections
+
+# 모델 키별 OpenCV DNN 기본 모델 설정 이름 (INFERENCE_BACKEND = "default"일 때, 또는 변환 모델이 없을 때 사용)
+OPENCV_DNN_MODELS = {
+    "face": ("FACE_MODEL", "FACE_PROTO"),
+    "age": ("AGE_MODEL", "AGE_PROTO"),
+    "gender": ("GENDER_MODEL", "GENDER_PROTO"),
+}
+
+
+def cached_artifact_path(model_path, suffix, extra_key=""):
+    """
+    원본 모델 경로/크기/수정 시각으로 키를 만든 디스크 캐시 경로를 반환합니다.
+    원본 모델이 바뀌면 키가 달라지므로 오래된 캐시는 자연히 사용되지 않습니다.
+    """
+    stat = os.stat(model_path)
+    key_source = f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}:{extra_key}"
+    key = hashlib.sha1(key_source.encode("utf-8")).hexdigest()[:16]
+    os.makedirs(settings.MODEL_CACHE_DIR, exist_ok=True)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(settings.MODEL_CACHE_DIR, f"{name}.{key}.{suffix}")
+
+
+class InferenceError(RuntimeError):
+    """ONNX Runtime / OpenVINO 추론 실패 (잘못된 입력 크기 등, OpenCV DNN의 cv2.error에 해당)"""
+
+
+# 분류기가 입력 단위로 건너뛸 수 있는 추론 오류 (백엔드 공통)
+INFERENCE_ERRORS = (cv2.error, InferenceError)
+
+
+def forward_batches(net, blob):
+    """
+    blob을 네트워크의 고정 배치 크기(net.batch_size) 단위로 나누어 추론합니다.
+    고정 배치보다 적은 마지막 청크는 빈 입력으로 채우고, cv2.dnn.Net이나 동적 배치(None)이면 한 번에 추론합니다.
+
+    Yields:
+        tuple: (start, count, output) - 청크의 시작 인덱스, 실제 입력 수, 네트워크 출력 (패딩 포함)
+    """
+    batch_size = getattr(net, "batch_size", None) or len(blob)
+    for start in range(0, len(blob), batch_size):
+        chunk = blob[start:start + batch_size]
+        count = len(chunk)
+        if count < batch_size: # 고정 배치보다 적으면 빈 입력으로 채움
+            chunk = np.concatenate([chunk, np.zeros((batch_size - count,) + chunk.shape[1:], dtype=chunk.dtype)])
+        net.setInput(chunk)
+        yield start, count, net.forward()
+
+
+class OnnxRuntimeNet:
+    """
+    ONNX Runtime 세션을 cv2.dnn.Net과 같은 setInput()/forward() 인터페이스로 감쌉니다.
+    (분류기 코드는 백엔드와 무관하게 동일하게 동작)
+    """
+    def __init__(self, model_path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if settings.INFERENCE_NUM_THREADS:
+            options.intra_op_num_threads = settings.INFERENCE_NUM_THREADS
+
+        # 그래프 최적화 결과를 디스크에 캐시하여, 다음 부팅부터는 최적화 단계를 건너뜀
+        cache_path = cached_artifact_path(model_path, "ort.onnx", extra_key=ort.__version__)
+        if os.path.exists(cache_path):
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            model_path = cache_path
+        else:
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.optimized_model_filepath = cache_path
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # 고정 배치 그래프이면 배치 크기, 동적 배치이면 None
+        self.batch_size = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self._blob = None
+
+    def setInput(self, blob):
+        self._blob = np.ascontiguousarray(blob, dtype=np.float32)
+
+    def forward(self):
+        try:
+            return self.session.run(None, {self.input_name: self._blob})[0]
+        except Exception as e: # onnxruntime의 Fail/InvalidArgument 등은 공통 기반 클래스가 없음
+            raise InferenceError(str(e)) from e
+
+
+class OpenVinoNet:
+    """OpenVINO 컴파일 모델을 cv2.dnn.Net과 같은 setInput()/forward() 인터페이스로 감쌉니다."""
+    def __init__(self, model_path):
+        import openvino as ov
+
+        config = {}
+        if settings.INFERENCE_NUM_THREADS:
+            config["INFERENCE_NUM_THREADS"] = settings.INFERENCE_NUM_THREADS
+        core = ov.Core()
+        # 컴파일된 모델 블롭을 디스크에 캐시하여, 다음 부팅부터는 컴파일을 건너뜀
+        core.set_property({"CACHE_DIR": settings.MODEL_CACHE_DIR})
+        self.compiled = core.compile_model(core.read_model(model_path), "CPU", config)
+        self.output = self.compiled.output(0)
+        batch_dim = self.compiled.input(0).get_partial_shape()[0]
+        self.batch_size = batch_dim.get_length() if batch_dim.is_static else None
+        self._blob = None
+
+    def setInput(self, blob):
+        self._blob = np.ascontiguousarray(blob, dtype=np.float32)
+
+    def forward(self):
+        try:
+            return self.compiled([self._blob])[self.output]
+        except Exception as e:
+            raise InferenceError(str(e)) from e
+
+
+def get_backend_model_path(key):
+    """
+    현재 INFERENCE_BACKEND / INFERENCE_PRECISION에서 모델 키("person", "face", "age", "gender")에 해당하는 변환 모델 경로를 반환합니다.
+    default 백엔드이거나 변환 모델 파일이 없으면 None
+    """
+    paths = {
+        "onnxruntime": settings.ONNX_MODEL_PATHS,
+        "openvino": settings.OPENVINO_MODEL_PATHS,
+    }.get(settings.INFERENCE_BACKEND)
+    if paths is None:
+        return None
+
+    path = paths.get(key)
+    if path:
+        path = path.format(precision=settings.INFERENCE_PRECISION)
+    if path and os.path.exists(path):
+        return path
+    print(f"[{settings.INFERENCE_BACKEND}] '{key}' model not found at {path}; falling back to the default backend.")
+    return None
+
+
+def load_backend_net(model_path):
+    """INFERENCE_BACKEND에 맞는 런타임으로 변환 모델을 로드합니다."""
+    if settings.INFERENCE_BACKEND == "openvino":
+        return OpenVinoNet(model_path)
+    return OnnxRuntimeNet(model_path)
+
+
+def load_dnn_net(key):
+    """
+    분류기용 네트워크(face/age/gender)를 로드합니다.
+    설정된 백엔드의 변환 모델이 있으면 해당 런타임으로, 없으면 OpenCV DNN(CPU)으로 로드합니다.
+    """
+    model_path = get_backend_model_path(key)
+    if model_path is not None:
+        return load_backend_net(model_path)
+
+    model_name, proto_name = OPENCV_DNN_MODELS[key]
+    net = cv2.dnn.readNet(getattr(settings, model_name), getattr(settings, proto_name))
+    # CPU 백엔드 명시
+    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+    net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+    return net
+
+
+def letterbox(frame, size):
+    """
+    비율을 유지하며 size x size 정사각형에 맞춥니다. (YOLO 전처리)
+
+    Returns:
+        tuple: (letterbox 이미지, 원본 좌표 복원용 (scale, pad_x, pad_y))
+    """
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return canvas, (scale, pad_x, pad_y)
+
+
+def yolo_blob(frames, size):
+    """letterbox된 프레임들을 YOLO 입력 Blob (N, 3, size, size, RGB, 0~1)으로 변환합니다."""
+    letterboxed, transforms = zip(*(letterbox(frame, size) for frame in frames))
+    return cv2.dnn.blobFromImages(list(letterboxed), 1 / 255.0, (size, size), swapRB=True), transforms
+
+
+class YoloOnnxDetector:
+    """
+    ONNX/OpenVINO로 변환한 YOLOv8 모델의 전처리(letterbox)와 후처리(디코딩 + NMS)를 직접 수행합니다.
+    ultralytics/torch 없이 동작하며, 입력 해상도는 YOLO_INPUT_SIZE로 고정됩니다.
+    고정 배치 그래프(tools/export_models.py는 배치 1로 변환)이면 프레임을 배치 크기 단위로 나누어 추론합니다.
+    """
+    CONF_THRESHOLD = 0.25 # ultralytics 기본값과 동일
+    NMS_THRESHOLD = 0.7
+
+    def __init__(self, model_path):
+        self.net = load_backend_net(model_path)
+        self.input_size = settings.YOLO_INPUT_SIZE
+
+    def __call__(self, frames):
+        """
+        Returns:
+            list: 프레임별 PersonDetections 리스트
+        """
+        blob, transforms = yolo_blob(frames, self.input_size)
+        outputs = []
+        for _, count, output in forward_batches(self.net, blob):
+            outputs.extend(output[:count]) # (batch, 4 + num_classes, num_anchors)
+
+        detections_per_frame = []
+        for output, frame, (scale, pad_x, pad_y) in zip(outputs, frames, transforms):
+            preds = output.T # (num_anchors, 4 + num_classes)
+            scores = preds[:, 4] # class 0 = 'person'
+            keep = scores > self.CONF_THRESHOLD
+            preds, scores = preds[keep], scores[keep]
+
+            # cx, cy, w, h (letterbox 좌표) -> x1, y1, x2, y2 (원본 좌표)
+            cx, cy, w, h = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+            xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+            xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / scale).clip(0, frame.shape[1])
+            xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / scale).clip(0, frame.shape[0])
+
+            # 패딩 영역에만 걸친 박스 제거
+            valid = (xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])
+            xyxy, scores = xyxy[valid], scores[valid]
+
+            if not len(xyxy):
+                detections_per_frame.append(PersonDetections.empty())
+                continue
+            xywh = np.column_stack([xyxy[:, :2], xyxy[:, 2:] - xyxy[:, :2]]).tolist()
+            keep_idx = np.array(cv2.dnn.NMSBoxes(xywh, scores.tolist(), self.CONF_THRESHOLD, self.NMS_THRESHOLD)).flatten()
+            # ultralytics와 같이 신뢰도 내림차순
+            keep_idx = keep_idx[np.argsort(-scores[keep_idx], kind="stable")]
+            detections_per_frame.append(PersonDetections.from_xyxy(xyxy[keep_idx], scores[keep_idx]))
+        return detections_per_frame
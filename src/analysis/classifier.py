@@ -1,6 +1,9 @@
 import cv2
 import numpy as np
 from config import settings # 설정 파일 임포트
+from src.analysis.backends import INFERENCE_ERRORS, forward_batches, load_dnn_net
+from src.analysis.results import GENDERS, UNKNOWN_CODE, codes_to_tags
+from src.utils.metrics import metrics
 
 class DemographicClassifier:
     
@@ -8,27 +11,23 @@ class DemographicClassifier:
     MODEL_MEAN_VALUES = (104.0, 177.0, 123.0)
     AGE_LIST = ['(0-2)', '(4-6)', '(8-12)', '(15-20)', '(25-32)', '(38-43)', '(48-53)', '(60-100)']
     GENDER_LIST = ['Male', 'Female']
+    # AGE_LIST 인덱스 -> 연령대 인덱스 (results.AGE_GROUPS: "20s", "30-50s"), 그 외 연령대는 -1 (집계 제외)
+    AGE_GROUP_INDEX = np.array([-1, -1, -1, 0, 0, 1, 1, -1], dtype=np.int8)
+    # GENDER_LIST 인덱스 -> 성별 인덱스 (results.GENDERS)
+    GENDER_INDEX = np.array([GENDERS.index(gender.lower()) for gender in GENDER_LIST], dtype=np.int8)
     FACE_CONF_THRESHOLD = 0.7 # 얼굴 인식 최소 신뢰도
     FACE_SIZE = (300, 300)
     AGE_GENDER_SIZE = (227, 227)
 
     def __init__(self):
         # [수정] PyTorch 모델 대신 OpenCV DNN 모델 로드
+        # INFERENCE_BACKEND가 onnxruntime/openvino이고 변환 모델이 있으면 해당 런타임으로 로드 (CPU)
         try:
-            self.FACE_NET = cv2.dnn.readNet(settings.FACE_MODEL, settings.FACE_PROTO)
-            self.AGE_NET = cv2.dnn.readNet(settings.AGE_MODEL, settings.AGE_PROTO)
-            self.GENDER_NET = cv2.dnn.readNet(settings.GENDER_MODEL, settings.GENDER_PROTO)
+            self.FACE_NET = load_dnn_net("face")
+            self.AGE_NET = load_dnn_net("age")
+            self.GENDER_NET = load_dnn_net("gender")
             
-            print("OpenCV DNN Age/Gender/Face models loaded successfully.")
-            
-            # [Optional] CPU 백엔드 명시
-            self.FACE_NET.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-            self.AGE_NET.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-            self.GENDER_NET.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-            
-            self.FACE_NET.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
-            self.AGE_NET.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
-            self.GENDER_NET.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            print(f"Age/Gender/Face models loaded successfully (backend: {settings.INFERENCE_BACKEND}).")
             
         except Exception as e:
             print(f"Error loading OpenCV DNN models: {e}")
@@ -38,6 +37,29 @@ class DemographicClassifier:
             self.AGE_NET = None
             self.GENDER_NET = None
 
+    def warmup(self):
+        """
+        각 네트워크를 더미 입력으로 한 번씩 실행하여 첫 실제 분류의 지연을 미리 처리합니다.
+        나이/성별 네트워크는 최대 배치 크기로 실행하여 배치 추론용 메모리도 미리 할당합니다.
+        """
+        if self.FACE_NET is None or self.AGE_NET is None or self.GENDER_NET is None:
+            return
+
+        self._forward(self.FACE_NET, np.zeros((1, 3, *self.FACE_SIZE), dtype=np.float32))
+
+        # 고정 배치 변환 모델(ONNX/OpenVINO)은 _forward가 배치 크기 단위로 나누어 실행
+        batch = np.zeros((max(1, settings.CLASSIFIER_MAX_BATCH_SIZE), 3, *self.AGE_GENDER_SIZE), dtype=np.float32)
+        for net in (self.AGE_NET, self.GENDER_NET):
+            self._forward(net, batch)
+
+    @staticmethod
+    def _forward(net, blob):
+        """
+        blob을 추론하여 입력 수만큼의 출력을 반환합니다. (N, ...)
+        배치 크기가 고정된 변환 모델은 배치 크기 단위로 나누고 부족한 입력은 채운 뒤 패딩 출력을 버립니다.
+        """
+        return np.concatenate([output[:count] for _, count, output in forward_batches(net, blob)])
+
     def _get_face_box(self, person_image):
         """YOLO가 크롭한 '사람' 이미지에서 '얼굴'을 찾습니다."""
         
@@ -46,18 +68,17 @@ class DemographicClassifier:
         
         # 1. 얼굴 인식을 위한 Blob 생성
         blob = cv2.dnn.blobFromImage(person_image, 1.0, self.FACE_SIZE, self.MODEL_MEAN_VALUES, swapRB=False)
-        self.FACE_NET.setInput(blob)
-        detections = self.FACE_NET.forward()
+        detections = self._detect_faces_batch(blob) # (K, 7): [image_id, label, conf, x1, y1, x2, y2]
         
-        for i in range(detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
+        for i in range(len(detections)):
+            confidence = detections[i, 2]
             
             if confidence > self.FACE_CONF_THRESHOLD:
                 # 2. 얼굴 좌표 계산
-                x1 = int(detections[0, 0, i, 3] * frame_width)
-                y1 = int(detections[0, 0, i, 4] * frame_height)
-                x2 = int(detections[0, 0, i, 5] * frame_width)
-                y2 = int(detections[0, 0, i, 6] * frame_height)
+                x1 = int(detections[i, 3] * frame_width)
+                y1 = int(detections[i, 4] * frame_height)
+                x2 = int(detections[i, 5] * frame_width)
+                y2 = int(detections[i, 6] * frame_height)
                 
                 # 3. 좌표 보정 및 얼굴 이미지 크롭
                 x1, y1 = max(0, x1), max(0, y1)
@@ -70,65 +91,260 @@ class DemographicClassifier:
                     
         return None # 얼굴 감지 실패
 
-    def classify_demographics(self, frame, person_boxes):
+    def _detect_faces_batch(self, blob):
         """
-        감지된 사람들 영역을 잘라내어 연령/성별을 분류합니다.
-        (YOLO -> Face Detect -> Age/Gender)
+        FACE_NET(SSD)을 배치로 실행하여 모든 입력 이미지의 검출을 하나의 (K, 7) 배열로 반환합니다.
+        고정 배치 모델은 배치 크기 단위로 나누어 실행하므로, 청크별 image_id를 blob 기준으로 보정하고
+        패딩 입력에서 나온 검출은 버립니다.
+        """
+        chunks = []
+        for start, count, output in forward_batches(self.FACE_NET, blob):
+            detections = output[0, 0]
+            detections = detections[detections[:, 0] < count]
+            detections[:, 0] += start
+            chunks.append(detections)
+        return np.concatenate(chunks)
+
+    def _get_tiles(self, frame_height, frame_width):
+        """FACE_DETECTION_TILES 설정에 따라 프레임을 겹치는 타일 좌표 (x1, y1, x2, y2)로 나눕니다."""
+        rows, cols = settings.FACE_DETECTION_TILES
+        tile_h, tile_w = frame_height / rows, frame_width / cols
+        pad_y, pad_x = int(tile_h * settings.FACE_TILE_OVERLAP), int(tile_w * settings.FACE_TILE_OVERLAP)
+
+        tiles = []
+        for r in range(rows):
+            for c in range(cols):
+                x1 = max(0, int(c * tile_w) - pad_x)
+                y1 = max(0, int(r * tile_h) - pad_y)
+                x2 = min(frame_width, int((c + 1) * tile_w) + pad_x)
+                y2 = min(frame_height, int((r + 1) * tile_h) + pad_y)
+                tiles.append((x1, y1, x2, y2))
+        return tiles
+
+    def _detect_faces_full_frame(self, frame):
+        """
+        프레임 전체(또는 몇 개의 타일)에서 얼굴을 한 번에 검출합니다.
+        타일들은 하나의 배치로 묶어 FACE_NET을 한 번만 실행하므로,
+        사람 수와 관계없이 프레임당 얼굴 검출 비용이 일정합니다.
+
+        Returns:
+            tuple: (faces, confidences)
+                   faces: (F, 4) 프레임 좌표 얼굴 박스 배열, confidences: (F,) 신뢰도 배열
+        """
+        frame_height, frame_width = frame.shape[:2]
+        tiles = self._get_tiles(frame_height, frame_width)
+        tile_images = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+
+        blob = cv2.dnn.blobFromImages(tile_images, 1.0, self.FACE_SIZE, self.MODEL_MEAN_VALUES, swapRB=False)
+        detections = self._detect_faces_batch(blob) # (K, 7): [image_id, label, conf, x1, y1, x2, y2]
+
+        detections = detections[detections[:, 2] > self.FACE_CONF_THRESHOLD]
+        if len(detections) == 0:
+            return np.empty((0, 4), dtype=int), np.empty((0,), dtype=np.float32)
+
+        # 1. 타일 기준 정규화 좌표를 프레임 좌표로 변환
+        tile_arr = np.array(tiles, dtype=np.float32)[detections[:, 0].astype(int)]
+        tile_w = tile_arr[:, 2] - tile_arr[:, 0]
+        tile_h = tile_arr[:, 3] - tile_arr[:, 1]
+        faces = np.stack([
+            tile_arr[:, 0] + detections[:, 3] * tile_w,
+            tile_arr[:, 1] + detections[:, 4] * tile_h,
+            tile_arr[:, 0] + detections[:, 5] * tile_w,
+            tile_arr[:, 1] + detections[:, 6] * tile_h,
+        ], axis=1).astype(int)
+        faces[:, [0, 2]] = faces[:, [0, 2]].clip(0, frame_width)
+        faces[:, [1, 3]] = faces[:, [1, 3]].clip(0, frame_height)
+        confidences = detections[:, 2]
+
+        valid = (faces[:, 2] > faces[:, 0]) & (faces[:, 3] > faces[:, 1])
+        faces, confidences = faces[valid], confidences[valid]
+
+        # 2. 타일 겹침 영역에서 중복 검출된 얼굴 제거 (NMS)
+        if len(tiles) > 1 and len(faces) > 1:
+            xywh = [[int(x1), int(y1), int(x2 - x1), int(y2 - y1)] for x1, y1, x2, y2 in faces]
+            keep = np.array(cv2.dnn.NMSBoxes(xywh, confidences.tolist(), self.FACE_CONF_THRESHOLD, 0.4)).flatten()
+            faces, confidences = faces[keep], confidences[keep]
+
+        return faces, confidences
+
+    def _assign_faces_to_persons(self, faces, confidences, person_boxes):
         """
-        results = []
-        if not person_boxes or self.AGE_NET is None or self.GENDER_NET is None or self.FACE_NET is None:
-            return results
+        검출된 얼굴을 그 중심점을 포함하는 사람 박스에 매칭합니다.
+        신뢰도가 높은 얼굴부터, 포함하는 박스 중 가장 작은(가장 꼭 맞는) 박스에 배정하며
+        사람 한 명당 얼굴은 하나만 배정합니다. (기존 '첫 번째 얼굴만 반환'과 동일)
 
-        for box in person_boxes:
+        Returns:
+            dict: {사람 박스 인덱스: 얼굴 박스 (x1, y1, x2, y2)}
+        """
+        boxes = np.asarray(person_boxes, dtype=int).reshape(-1, 4)
+        centers_x = (faces[:, 0] + faces[:, 2]) / 2
+        centers_y = (faces[:, 1] + faces[:, 3]) / 2
+
+        # (F, N) 포함 관계 행렬을 한 번에 계산
+        contains = (
+            (centers_x[:, None] >= boxes[None, :, 0]) & (centers_x[:, None] < boxes[None, :, 2]) &
+            (centers_y[:, None] >= boxes[None, :, 1]) & (centers_y[:, None] < boxes[None, :, 3])
+        )
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+        assignments = {}
+        for face_idx in np.argsort(-confidences, kind="stable"):
+            candidates = [i for i in np.flatnonzero(contains[face_idx]) if i not in assignments]
+            if candidates:
+                best = min(candidates, key=lambda i: areas[i])
+                assignments[best] = faces[face_idx]
+        return assignments
+
+    def _collect_face_crops(self, frame, person_boxes):
+        """
+        FACE_DETECTION_MODE 설정에 따라 사람 박스 순서대로 얼굴 크롭을 수집합니다.
+
+        Returns:
+            list: 사람 박스별 얼굴 크롭 이미지 또는 None (얼굴 없음)
+        """
+        face_crops = [None] * len(person_boxes)
+
+        if settings.FACE_DETECTION_MODE == "full_frame":
+            faces, confidences = self._detect_faces_full_frame(frame)
+            if len(faces) == 0:
+                return face_crops
+
+            for idx, (fx1, fy1, fx2, fy2) in self._assign_faces_to_persons(faces, confidences, person_boxes).items():
+                x1, y1, x2, y2 = person_boxes[idx]
+                # 사람 박스 내부로 좌표 보정 (per_person 모드의 크롭 범위와 일치)
+                fx1, fy1 = max(x1, fx1), max(y1, fy1)
+                fx2, fy2 = min(x2, fx2), min(y2, fy2)
+                if fx2 > fx1 and fy2 > fy1:
+                    face_crops[idx] = frame[fy1:fy2, fx1:fx2]
+            return face_crops
+
+        for idx, box in enumerate(person_boxes):
             x1, y1, x2, y2 = box
-            
-            # 1. YOLO 박스로 '사람' 영역 크롭
+
+            # YOLO 박스로 '사람' 영역 크롭
             person_crop = frame[y1:y2, x1:x2]
             if person_crop.size == 0:
                 continue
 
-            # 2. '사람' 영역에서 '얼굴' 찾기
-            face_crop = self._get_face_box(person_crop)
-            
-            # 3. 얼굴이 감지된 경우에만 나이/성별 추론
-            if face_crop is not None and face_crop.size > 0:
-                try:
-                    # 4. 나이/성별 추론을 위한 Blob 생성
-                    blob = cv2.dnn.blobFromImage(face_crop, 1.0, self.AGE_GENDER_SIZE, self.MODEL_MEAN_VALUES, swapRB=False)
-                    
-                    # 5. 성별 추론
-                    self.GENDER_NET.setInput(blob)
-                    gender_preds = self.GENDER_NET.forward()
-                    gender = self.GENDER_LIST[gender_preds[0].argmax()]
-                    
-                    # 6. 나이 추론
-                    self.AGE_NET.setInput(blob)
-                    age_preds = self.AGE_NET.forward()
-                    age_category = self.AGE_LIST[age_preds[0].argmax()]
-
-                    # [TODO] 7. 태그 형식 변환 (DB와 맞추기)
-                    # (e.g., age_category '(25-32)'와 gender 'Female'을 '20s_female'로)
-                    # 이 부분은 ad_db.json의 태그 형식에 맞게 변환해야 합니다.
-                    # 예시:
-                    if age_category in ['(15-20)', '(25-32)']:
-                        age_tag = "20s"
-                    elif age_category in ['(38-43)', '(48-53)']:
-                        age_tag = "30-50s"
-                    else:
-                        age_tag = "other" # 또는 age_category
-                    
-                    gender_tag = gender.lower() # "Female" -> "female"
-                    
-                    # ad_db.json 태그 형식: "20s_female", "30-50s_male"
-                    final_tag = f"{age_tag}_{gender_tag}" 
-                    
-                    # 'other' 태그는 집계에서 제외하거나 따로 처리
-                    if age_tag != "other":
-                         results.append(final_tag)
-                         
-                except cv2.error as e:
-                    # 크롭된 이미지가 너무 작거나 유효하지 않을 때 발생
-                    # print(f"OpenCV error during inference: {e}")
-                    continue
-            
-        return results
\ No newline at end of file
+            # '사람' 영역에서 '얼굴' 찾기
+            face_crops[idx] = self._get_face_box(person_crop)
+        return face_crops
+
+    def _decode_predictions(self, age_preds, gender_preds):
+        """
+        네트워크 출력(softmax) 배치를 인구통계 그룹 코드와 신뢰도 배열로 한 번에 변환합니다.
+        (e.g., '(25-32)' + 'Female' -> "20s_female"의 코드, 'other' 연령대는 UNKNOWN_CODE)
+        confidence는 나이/성별 최고 확률의 곱입니다.
+
+        Returns:
+            tuple: (codes (B,) int8, confidences (B,) float32)
+        """
+        age_preds = np.asarray(age_preds).reshape(len(age_preds), -1)
+        gender_preds = np.asarray(gender_preds).reshape(len(gender_preds), -1)
+        age_idx, gender_idx = age_preds.argmax(axis=1), gender_preds.argmax(axis=1)
+        rows = np.arange(len(age_idx))
+        confidences = (age_preds[rows, age_idx] * gender_preds[rows, gender_idx]).astype(np.float32)
+
+        age_group = self.AGE_GROUP_INDEX[age_idx]
+        codes = np.where(age_group >= 0, age_group * len(GENDERS) + self.GENDER_INDEX[gender_idx], UNKNOWN_CODE)
+        return codes.astype(np.int8), confidences
+
+    def _predict_age_gender_single(self, face_crop):
+        """얼굴 하나에 대해 나이/성별을 추론합니다. (기존 얼굴별 경로)"""
+        try:
+            blob = cv2.dnn.blobFromImage(face_crop, 1.0, self.AGE_GENDER_SIZE, self.MODEL_MEAN_VALUES, swapRB=False)
+            gender_preds = self._forward(self.GENDER_NET, blob)
+            age_preds = self._forward(self.AGE_NET, blob)
+        except INFERENCE_ERRORS:
+            # 크롭된 이미지가 너무 작거나 유효하지 않을 때 발생
+            return np.array([UNKNOWN_CODE], dtype=np.int8), np.zeros(1, dtype=np.float32)
+
+        return self._decode_predictions(age_preds[:1], gender_preds[:1])
+
+    def _predict_age_gender_batch(self, face_crops):
+        """
+        여러 얼굴을 하나의 NCHW 배치로 묶어 나이/성별 네트워크를 각각 한 번씩만 실행합니다.
+        메모리 사용량을 제한하기 위해 CLASSIFIER_MAX_BATCH_SIZE 단위로 나누어 추론합니다.
+
+        Args:
+            face_crops (list): 얼굴 크롭 이미지 리스트
+
+        Returns:
+            tuple: 얼굴별 (codes, confidences) 배열 (추론 실패 시 UNKNOWN_CODE, 0.0)
+        """
+        batch_size = max(1, settings.CLASSIFIER_MAX_BATCH_SIZE)
+        predictions = []
+
+        for start in range(0, len(face_crops), batch_size):
+            chunk = face_crops[start:start + batch_size]
+            if len(chunk) == 1:
+                predictions.append(self._predict_age_gender_single(chunk[0]))
+                continue
+
+            try:
+                # 1. 청크 전체를 하나의 Blob(N, 3, 227, 227)으로 생성
+                blob = cv2.dnn.blobFromImages(chunk, 1.0, self.AGE_GENDER_SIZE, self.MODEL_MEAN_VALUES, swapRB=False)
+
+                # 2. 성별/나이 추론 (네트워크당 한 번, 고정 배치 모델은 배치 크기 단위)
+                gender_preds = self._forward(self.GENDER_NET, blob)
+                age_preds = self._forward(self.AGE_NET, blob)
+            except INFERENCE_ERRORS:
+                # 배치 중 하나라도 유효하지 않으면 얼굴별 경로로 대체 (결과 동일성 유지)
+                predictions.extend(self._predict_age_gender_single(face) for face in chunk)
+                continue
+
+            predictions.append(self._decode_predictions(age_preds, gender_preds))
+
+        codes, confidences = zip(*predictions)
+        return np.concatenate(codes), np.concatenate(confidences)
+
+    def classify_persons(self, frame, person_boxes):
+        """
+        사람 박스별로 연령/성별을 분류하여 입력 박스와 같은 순서의 결과를 반환합니다.
+        (트래커가 각 트랙에 레이블을 붙일 때 사용)
+
+        Args:
+            frame (np.array): OpenCV BGR 프레임
+            person_boxes (np.array): (N, 4) int32 박스 배열 (또는 (x1, y1, x2, y2) 리스트)
+
+        Returns:
+            tuple: (codes, confidences) 박스별 인구통계 그룹 코드 (N,) int8 / 신뢰도 (N,) float32 배열
+                   얼굴 미검출 또는 'other' 연령대인 경우 코드는 UNKNOWN_CODE
+        """
+        person_boxes = np.asarray(person_boxes, dtype=np.int32).reshape(-1, 4)
+        codes = np.full(len(person_boxes), UNKNOWN_CODE, dtype=np.int8)
+        confidences = np.zeros(len(person_boxes), dtype=np.float32)
+        if len(person_boxes) == 0 or self.AGE_NET is None or self.GENDER_NET is None or self.FACE_NET is None:
+            return codes, confidences
+
+        # 1. 모든 사람 영역에서 유효한 얼굴 크롭 수집
+        indices, face_crops = [], []
+        with metrics.span("face_detection"):
+            for idx, face_crop in enumerate(self._collect_face_crops(frame, person_boxes)):
+                if face_crop is not None and face_crop.size > 0:
+                    indices.append(idx)
+                    face_crops.append(face_crop)
+
+        metrics.inc("faces_found", len(face_crops))
+        metrics.inc("faces_missed", len(person_boxes) - len(face_crops))
+        if not face_crops:
+            return codes, confidences
+
+        # 2. 수집된 얼굴에 대해 나이/성별 배치 추론 후 박스 순서로 배치
+        with metrics.span("age_gender"):
+            codes[indices], confidences[indices] = self._predict_age_gender_batch(face_crops)
+
+        return codes, confidences
+
+    def classify_demographics(self, frame, person_boxes):
+        """
+        감지된 사람들 영역을 잘라내어 연령/성별을 분류합니다.
+        (YOLO -> Face Detect -> Age/Gender)
+
+        얼굴 크롭을 먼저 모두 모은 뒤, 나이/성별은 프레임당 배치 추론으로 처리합니다.
+
+        Returns:
+            list: 광고 DB 태그 리스트 (e.g., ["20s_female", "40s_male"])
+        """
+        codes, _ = self.classify_persons(frame, person_boxes)
+        return codes_to_tags(codes)
@@ -1,10 +1,26 @@
-from ultralytics import YOLO
+import numpy as np
 from config import settings
+from src.analysis.backends import YoloOnnxDetector, get_backend_model_path
+from src.analysis.results import PersonDetections
 
 class PersonDetector:
     def __init__(self):
-        # [TODO] YOLO 모델 로드 (YOLOv8 예시)
-        self.model = YOLO(settings.YOLO_MODEL_PATH)
+        # INFERENCE_BACKEND가 onnxruntime/openvino이고 변환 모델이 있으면 ultralytics 없이 직접 추론
+        backend_model_path = get_backend_model_path("person")
+        if backend_model_path is not None:
+            self.model = YoloOnnxDetector(backend_model_path)
+            self.uses_ultralytics = False
+        else:
+            # ultralytics/torch는 임포트만으로도 수 초가 걸리므로 실제로 필요할 때 임포트 (빠른 시작)
+            from ultralytics import YOLO
+
+            # [TODO] YOLO 모델 로드 (YOLOv8 예시)
+            self.model = YOLO(settings.YOLO_MODEL_PATH)
+            self.uses_ultralytics = True
+
+    def warmup(self):
+        """더미 입력으로 한 번 추론하여 첫 실제 프레임의 지연(초기화, 메모리 할당)을 미리 처리합니다."""
+        self.detect_persons(np.zeros((settings.YOLO_INPUT_SIZE, settings.YOLO_INPUT_SIZE, 3), dtype=np.uint8))
 
     def detect_persons(self, frame):
         """
@@ -14,13 +30,30 @@ class PersonDetector:
             frame (np.array): OpenCV BGR 프레임
 
         Returns:
-            list: 감지된 사람들의 바운딩 박스 (x1, y1, x2, y2) 리스트
+            PersonDetections: 감지된 사람들의 (N, 4) int32 박스 배열과 신뢰도 배열
+        """
+        return self.detect_persons_batch([frame])[0]
+
+    def detect_persons_batch(self, frames):
         """
-        # [TODO] 모델 추론 수행
-        results = self.model(frame, classes=[0], verbose=False) # class 0 = 'person'
+        여러 프레임(e.g., 여러 카메라의 최신 프레임)을 한 번의 모델 호출로 배치 추론합니다.
+
+        Args:
+            frames (list): OpenCV BGR 프레임 리스트
+
+        Returns:
+            list: 프레임별 PersonDetections 리스트
+        """
+        if not frames:
+            return []
+
+        if not self.uses_ultralytics:
+            return self.model(frames)
+
+        results = self.model(frames, classes=[0], verbose=False) # class 0 = 'person'
         
-        person_boxes = []
-        for box in results[0].boxes:
-            person_boxes.append(box.xyxy[0].cpu().numpy().astype(int))
-            
-        return person_boxes
\ No newline at end of file
+        # 박스별 변환 대신 프레임당 한 번에 (N, 4) int32 배열로 변환 (프레임 범위로 보정)
+        return [
+            PersonDetections.from_xyxy(result.boxes.xyxy.cpu().numpy(), result.boxes.conf.cpu().numpy(), frame.shape)
+            for frame, result in zip(frames, results)
+        ]
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+from config import settings
+
+class MotionGate:
+    """
+    YOLO 앞단의 가벼운 움직임 게이트.
+    축소한 흑백 프레임을 마지막으로 감지를 실행한 프레임과 비교하여,
+    변화가 임계값 미만이면 감지를 건너뛰고 이전 감지 결과를 재사용하도록 합니다.
+
+    기준 프레임은 감지를 실행할 때만 갱신하므로, 천천히 걸어 들어오는 사람처럼
+    조금씩 누적되는 변화도 결국 임계값을 넘어 감지됩니다.
+    또한 MOTION_GATE_MAX_SKIP 프레임 연속으로 건너뛰면 강제로 감지를 실행합니다.
+    """
+    def __init__(self):
+        self._reference = None # 마지막으로 감지를 실행한 프레임 (축소 흑백)
+        self._consecutive_skips = 0
+        self.total_frames = 0
+        self.skipped_frames = 0
+        self.last_change_ratio = 1.0 # 직전 프레임의 변화 픽셀 비율 (장면 변화 정도)
+
+    def reset(self):
+        self._reference = None
+        self._consecutive_skips = 0
+
+    @property
+    def skip_ratio(self):
+        """전체 프레임 중 감지를 건너뛴 비율"""
+        return self.skipped_frames / self.total_frames if self.total_frames else 0.0
+
+    def _preprocess(self, frame):
+        height, width = frame.shape[:2]
+        scale = settings.MOTION_GATE_WIDTH / width
+        small = cv2.resize(frame, (settings.MOTION_GATE_WIDTH, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0) # 센서 노이즈 완화
+
+    def should_detect(self, frame):
+        """
+        이번 프레임에서 YOLO 감지를 실행해야 하는지 판단합니다.
+
+        Returns:
+            bool: True이면 감지 실행, False이면 이전 감지 결과 재사용
+        """
+        self.total_frames += 1
+        small = self._preprocess(frame)
+
+        if self._reference is None or self._reference.shape != small.shape:
+            self.last_change_ratio = 1.0
+        else:
+            diff = cv2.absdiff(small, self._reference)
+            self.last_change_ratio = np.count_nonzero(diff > settings.MOTION_PIXEL_THRESHOLD) / diff.size
+
+            if (self.last_change_ratio < settings.MOTION_GATE_THRESHOLD
+                    and self._consecutive_skips < settings.MOTION_GATE_MAX_SKIP):
+                self._consecutive_skips += 1
+                self.skipped_frames += 1
+                return False
+
+        self._reference = small
+        self._consecutive_skips = 0
+        return True
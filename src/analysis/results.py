@@ -0,0 +1,62 @@
+import numpy as np
+
+# 인구통계 그룹 코드표: code = 연령대 인덱스 * 2 + 성별 인덱스
+# 분석 단계에서는 정수 코드만 사용하고, 문자열 태그(ad_db.json 형식)는 UI/광고 DB 경계에서만 만듭니다.
+AGE_GROUPS = ("20s", "30-50s")
+GENDERS = ("male", "female")
+DEMOGRAPHIC_TAGS = tuple(f"{age}_{gender}" for age in AGE_GROUPS for gender in GENDERS)
+NUM_DEMOGRAPHIC_CODES = len(DEMOGRAPHIC_TAGS)
+UNKNOWN_CODE = -1 # 미분류 / 얼굴 미검출 / 집계 제외 연령대
+
+
+def code_to_label(code):
+    """화면 표시용 레이블 (미분류는 "unknown")"""
+    return DEMOGRAPHIC_TAGS[code] if code >= 0 else "unknown"
+
+
+def codes_to_tags(codes):
+    """코드 배열을 광고 DB 태그 리스트로 변환합니다. (UNKNOWN_CODE 제외)"""
+    return [DEMOGRAPHIC_TAGS[code] for code in np.asarray(codes).tolist() if code >= 0]
+
+
+class PersonDetections:
+    """
+    프레임 하나의 사람 감지/분류 결과를 병렬 배열로 담습니다.
+
+    - boxes: (N, 4) int32 (x1, y1, x2, y2)
+    - scores: (N,) float32 감지 신뢰도
+    - codes: (N,) int8 인구통계 그룹 코드 (UNKNOWN_CODE = 미분류)
+    - code_scores: (N,) float32 분류 신뢰도
+    """
+    __slots__ = ("boxes", "scores", "codes", "code_scores")
+
+    def __init__(self, boxes, scores=None, codes=None, code_scores=None):
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        count = len(self.boxes)
+        self.scores = np.ones(count, dtype=np.float32) if scores is None else np.asarray(scores, dtype=np.float32)
+        self.codes = np.full(count, UNKNOWN_CODE, dtype=np.int8) if codes is None else np.asarray(codes, dtype=np.int8)
+        self.code_scores = (
+            np.zeros(count, dtype=np.float32) if code_scores is None else np.asarray(code_scores, dtype=np.float32))
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, 4), dtype=np.int32))
+
+    @classmethod
+    def from_xyxy(cls, xyxy, scores, frame_shape=None):
+        """
+        실수 좌표 박스 배열을 한 번에 int32로 변환합니다. (프레임 크기가 주어지면 범위 보정)
+        """
+        boxes = np.array(xyxy, dtype=np.float32).reshape(-1, 4) # 범위 보정이 입력 배열을 바꾸지 않도록 복사
+        if frame_shape is not None:
+            height, width = frame_shape[:2]
+            boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+            boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+        return cls(boxes.astype(np.int32), scores)
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def labels(self):
+        """화면 표시용 레이블 리스트 (UI 경계)"""
+        return [code_to_label(code) for code in self.codes.tolist()]
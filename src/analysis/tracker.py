@@ -0,0 +1,135 @@
+import numpy as np
+from config import settings
+from src.analysis.results import UNKNOWN_CODE, code_to_label
+
+class Track:
+    """
+    한 명의 보행자를 프레임 간에 추적하는 트랙.
+    분류 결과(label)는 트랙에 저장되어 같은 사람을 반복해서 분류하지 않도록 합니다.
+    """
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = box
+        self.label = UNKNOWN_CODE # 인구통계 그룹 코드 (미분류/얼굴 미검출 시 UNKNOWN_CODE)
+        self.confidence = 0.0    # 분류 신뢰도
+        self.classify_attempts = 0
+        self.missed = 0          # 연속으로 매칭되지 않은 프레임 수
+        self.counted = False     # 집계기에 이미 반영되었는지 여부
+
+    def needs_classification(self):
+        """아직 분류되지 않았거나 신뢰도가 낮은 트랙만 (재)분류 대상입니다."""
+        if self.classify_attempts >= settings.TRACK_MAX_CLASSIFY_ATTEMPTS:
+            return False
+        return self.label == UNKNOWN_CODE or self.confidence < settings.TRACK_MIN_CONFIDENCE
+
+    def display_label(self):
+        """화면에 표시할 레이블"""
+        return code_to_label(self.label)
+
+
+def _iou_matrix(boxes_a, boxes_b):
+    """(A, 4), (B, 4) 박스 배열 사이의 IoU 행렬 (A, B)을 계산합니다."""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+class PersonTracker:
+    """
+    PersonDetector와 DemographicClassifier 사이에 위치하는 경량 IoU 트래커.
+    매 프레임의 사람 박스를 기존 트랙에 연결하여, 각 사람은 한 번만 분류되도록 합니다.
+    """
+    def __init__(self):
+        self.tracks = []
+        self._next_id = 0
+
+    def reset(self):
+        """모든 트랙을 제거합니다. (영상 루프 재시작 시)"""
+        self.tracks = []
+
+    def update(self, person_boxes):
+        """
+        현재 프레임의 사람 박스를 기존 트랙과 IoU 기준으로 탐욕적으로 매칭합니다.
+
+        Args:
+            person_boxes (np.array): 감지된 사람들의 (N, 4) 박스 배열
+
+        Returns:
+            list: person_boxes와 같은 순서의 Track 리스트
+        """
+        matched = [None] * len(person_boxes)
+        matched_tracks = set()
+
+        if self.tracks and len(person_boxes) > 0:
+            iou = _iou_matrix([t.box for t in self.tracks], person_boxes)
+            # IoU가 높은 쌍부터 매칭
+            for flat_idx in np.argsort(-iou, axis=None, kind="stable"):
+                t_idx, b_idx = np.unravel_index(flat_idx, iou.shape)
+                if iou[t_idx, b_idx] < settings.TRACKER_IOU_THRESHOLD:
+                    break
+                if matched[b_idx] is not None or t_idx in matched_tracks:
+                    continue
+                track = self.tracks[t_idx]
+                track.box = person_boxes[b_idx]
+                matched_tracks.add(t_idx)
+                matched[b_idx] = track
+
+        # 매칭되지 않은 트랙은 missed 증가, 오래 보이지 않으면 제거
+        alive = []
+        for t_idx, track in enumerate(self.tracks):
+            track.missed = 0 if t_idx in matched_tracks else track.missed + 1
+            if track.missed <= settings.TRACKER_MAX_MISSED:
+                alive.append(track)
+        self.tracks = alive
+
+        # 매칭되지 않은 박스는 새 트랙 생성
+        for b_idx, box in enumerate(person_boxes):
+            if matched[b_idx] is None:
+                track = Track(self._next_id, box)
+                self._next_id += 1
+                self.tracks.append(track)
+                matched[b_idx] = track
+
+        return matched
+
+    def pending_classification(self, tracks):
+        """분류가 필요한 트랙만 골라 반환합니다."""
+        return [track for track in tracks if track.needs_classification()]
+
+    def labels_for(self, tracks):
+        """트랙 리스트의 현재 레이블 코드 배열"""
+        return np.fromiter((track.label for track in tracks), dtype=np.int8, count=len(tracks))
+
+    def apply_classification(self, tracks, results):
+        """
+        분류 결과를 트랙에 반영합니다.
+
+        Args:
+            tracks (list): 분류한 Track 리스트
+            results (tuple): DemographicClassifier.classify_persons의 (codes, confidences) 배열
+
+        Returns:
+            np.array: 이번에 처음 레이블이 붙은 트랙의 그룹 코드 배열 (고유 인원 집계용)
+        """
+        codes, confidences = results
+        new_codes = []
+        for track, code, confidence in zip(tracks, codes.tolist(), confidences.tolist()):
+            track.classify_attempts += 1
+            if code == UNKNOWN_CODE or confidence < track.confidence:
+                continue
+            track.label = code
+            track.confidence = confidence
+            if not track.counted:
+                track.counted = True
+                new_codes.append(code)
+        return np.array(new_codes, dtype=np.int8)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from config import settings
+from src.context.time_manager import get_time_context
+from src.context.weather_manager import get_weather_context
+
+class ContextProvider:
+    """
+    날씨/시간 컨텍스트 태그를 프레임 루프에 제공합니다.
+
+    - 날씨는 백그라운드 스레드가 WEATHER_REFRESH_TTL_SEC 마다 갱신하고,
+      갱신 중이거나 실패해도 마지막으로 성공한 값을 그대로 제공합니다. (stale-while-revalidate)
+    - API 오류 시에는 재시도 간격을 지수적으로 늘립니다. (최대 WEATHER_BACKOFF_MAX_SEC)
+    - 시간 태그는 I/O 없이 매 호출마다 계산합니다.
+
+    따라서 get_context_tags()는 네트워크를 기다리지 않습니다.
+    """
+    def __init__(self, api_key, city_name, base_url=None):
+        self.api_key = api_key
+        self.city_name = city_name
+        self.base_url = base_url or settings.WEATHER_API_URL
+
+        self.weather_tag = settings.WEATHER_FALLBACK_TAG # 첫 갱신 전까지 사용할 값
+        self.last_success_time = None
+        self.failures = 0 # 연속 실패 횟수
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """백그라운드 날씨 갱신 스레드를 시작합니다. (즉시 첫 갱신 시도)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refresh_loop, name="context-weather", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+
+    def get_context_tags(self):
+        """[time_tag, weather_tag] 리스트를 반환합니다. (네트워크 대기 없음)"""
+        return [get_time_context(), self.weather_tag]
+
+    def refresh_weather(self):
+        """
+        날씨를 한 번 갱신합니다.
+
+        Returns:
+            float: 다음 갱신까지 기다릴 시간 (초)
+        """
+        tag = get_weather_context(self.api_key, self.city_name, base_url=self.base_url,
+                                  timeout=settings.WEATHER_REQUEST_TIMEOUT_SEC)
+        if tag == "api_error":
+            return self._backoff_delay()
+
+        self.weather_tag = tag
+        self.last_success_time = time.time()
+        self.failures = 0
+        return settings.WEATHER_REFRESH_TTL_SEC
+
+    def _backoff_delay(self):
+        """마지막 정상 값을 유지하고, 실패가 이어질수록 재시도 간격을 늘립니다."""
+        self.failures += 1
+        return min(settings.WEATHER_BACKOFF_BASE_SEC * (2 ** (self.failures - 1)), settings.WEATHER_BACKOFF_MAX_SEC)
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                delay = self.refresh_weather()
+            except Exception as e:
+                # 예상치 못한 오류(잘못된 응답 형식 등)로 갱신 스레드가 종료되지 않도록 같은 재시도 간격 적용
+                print(f"Weather refresh error: {e}")
+                delay = self._backoff_delay()
+            self._stop_event.wait(delay)
@@ -1,11 +1,14 @@
 import requests
 
-def get_weather_context(api_key, city_name):
+OPENWEATHERMAP_URL = "http://api.openweathermap.org/data/2.5/weather"
+
+def get_weather_context(api_key, city_name, base_url=OPENWEATHERMAP_URL, timeout=5):
     """
     OpenWeatherMap API를 호출하여 현재 날씨를 기반으로
     컨텍스트 태그(e.g., "rainy_day")를 반환합니다.
+
+    base_url을 바꾸면 테스트용 로컬 스텁 서버를 대신 호출할 수 있습니다.
     """
-    base_url = "http://api.openweathermap.org/data/2.5/weather"
     params = {
         'q': city_name,
         'appid': api_key,
@@ -13,14 +16,17 @@ def get_weather_context(api_key, city_name):
     }
 
     try:
-        # 5초 타임아웃 설정
-        response = requests.get(base_url, params=params, timeout=5)
+        # 타임아웃 설정 (기본 5초)
+        response = requests.get(base_url, params=params, timeout=timeout)
         response.raise_for_status()  # 200 OK가 아니면 예외 발생
         
         data = response.json()
         
         # API 응답에서 주 날씨 정보를 가져옴
-        main_weather = data.get('weather', [{}])[0].get('main', 'Unknown')
+        # (형식이 잘못된 응답, 예: {"weather": []}이면 'Unknown'으로 처리)
+        weather = data.get('weather') if isinstance(data, dict) else None
+        current = weather[0] if isinstance(weather, list) and weather else {}
+        main_weather = current.get('main', 'Unknown') if isinstance(current, dict) else 'Unknown'
         
         # 날씨 정보를 데모용 태그로 변환
         if main_weather == 'Rain':
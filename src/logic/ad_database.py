@@ -1,22 +1,178 @@
 import json
+import sys
 
-def load_ad_database(json_path):
+from config import settings
+from src.analysis.results import DEMOGRAPHIC_TAGS
+
+# 광고에 붙일 수 있는 Context 태그 (time_manager / weather_manager가 반환하는 값)
+CONTEXT_TAGS = (
+    "morning_rush", "lunch_time", "evening_rush", "night_time", "day_time",
+    "rainy_day", "snowy_day", "sunny_day", "cloudy_day", "default_weather",
+)
+COMPACT_FORMAT = "compact-v1"
+
+
+def known_ad_tags():
+    """광고 DB에서 허용하는 태그 집합 (인구통계 + Context + 'all' + AD_EXTRA_TAGS)"""
+    return frozenset(DEMOGRAPHIC_TAGS) | frozenset(CONTEXT_TAGS) | {"all"} | frozenset(settings.AD_EXTRA_TAGS)
+
+
+def validate_ad_entry(ad_id, ad_info, allowed_tags):
     """
-    지정된 경로의 광고 DB JSON 파일을 로드합니다.
+    광고 항목 하나를 검증합니다.
+
+    Returns:
+        str: 오류 메시지 (유효하면 None)
+    """
+    if not isinstance(ad_id, str) or not ad_id:
+        return "invalid ad id"
+    if not isinstance(ad_info, dict):
+        return "entry is not an object"
+    file_path = ad_info.get("file_path")
+    if not isinstance(file_path, str) or not file_path:
+        return "missing file_path"
+    tags = ad_info.get("tags")
+    if not isinstance(tags, (list, tuple)) or not tags:
+        return "tags must be a non-empty list of strings"
+    try:
+        known = allowed_tags.issuperset(tags) # 허용 태그는 모두 문자열이므로 문자열 검사도 겸함
+    except TypeError: # 리스트/딕셔너리 등 해시할 수 없는 태그
+        known = False
+    if not known:
+        return f"unknown tags {[tag for tag in tags if not isinstance(tag, str) or tag not in allowed_tags]}"
+    weight = ad_info.get("weight", 1.0)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+        return "weight must be a non-negative number"
+    return None
+
+
+def _parse_compact(data, canonical, previous):
+    """
+    압축 형식을 검증하여 정규화된 카탈로그로 변환합니다.
+    압축 형식은 태그 문자열을 한 번만 저장하고 광고마다 태그 인덱스만 가집니다.
+        {"format": "compact-v1", "tags": ["20s_female", ...], "ads": {"ad001": [file_path, [0, 3], weight]}}
+    태그 테이블을 한 번만 검증하므로 광고별로는 인덱스 범위만 확인합니다.
+    """
+    tag_table = data.get("tags")
+    ads = data.get("ads")
+    if not isinstance(tag_table, list) or not isinstance(ads, dict):
+        return {}, [(None, "invalid compact catalogue")]
+    # 알 수 없는 태그는 None으로 두고, 그 태그를 쓰는 광고만 거부
+    table = [canonical.get(tag) if isinstance(tag, str) else None for tag in tag_table]
+
+    ad_db, errors = {}, []
+    for ad_id, entry in ads.items():
+        if not isinstance(entry, list) or len(entry) != 3 or not isinstance(entry[1], list):
+            errors.append((ad_id, "malformed entry"))
+            continue
+        file_path, tag_ids, weight = entry
+        try:
+            tags = tuple(table[i] if isinstance(i, int) and i >= 0 else None for i in tag_ids)
+        except IndexError:
+            errors.append((ad_id, "tag index out of range"))
+            continue
+        if not isinstance(file_path, str) or not file_path:
+            errors.append((ad_id, "missing file_path"))
+        elif not tags:
+            errors.append((ad_id, "tags must be a non-empty list of strings"))
+        elif None in tags:
+            unknown = [tag_table[i] if isinstance(i, int) and i >= 0 else i for i, tag in zip(tag_ids, tags) if tag is None]
+            errors.append((ad_id, f"unknown tags {unknown}"))
+        elif isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            errors.append((ad_id, "weight must be a non-negative number"))
+        else:
+            entry = {"file_path": file_path, "tags": tags, "weight": float(weight)}
+            old = previous.get(ad_id)
+            ad_db[sys.intern(ad_id)] = old if old == entry else entry
+    return ad_db, errors
+
+
+def parse_ad_catalogue(data, allowed_tags=None, previous=None):
+    """
+    광고 DB JSON 객체(일반 또는 압축 형식)를 검증하여 정규화된 카탈로그로 변환합니다.
+
+    - 태그는 허용 태그 집합의 문자열 객체를 공유(intern)하여 튜플로 저장합니다. (광고마다 중복 문자열을 두지 않음)
+    - previous 카탈로그에 내용이 같은 항목이 있으면 그 객체를 그대로 재사용합니다. (재로드 시 메모리 절약)
 
     Args:
-        json_path (str): 'config/ad_db.json' 파일 경로
+        data (dict): json.load 결과
+        allowed_tags (set): 허용 태그 집합 (기본값: known_ad_tags())
+        previous (dict): 직전에 로드한 카탈로그
 
     Returns:
-        dict: 광고 정보 딕셔너리
+        tuple: (ad_db, errors) - ad_db는 {ad_id: {"file_path", "tags", "weight"}}, errors는 [(ad_id, 사유)]
+    """
+    allowed_tags = known_ad_tags() if allowed_tags is None else frozenset(allowed_tags)
+    canonical = {tag: sys.intern(tag) for tag in allowed_tags} # 태그 문자열 -> 공유 문자열 객체
+    previous = previous or {}
+    if not isinstance(data, dict):
+        return {}, [(None, "catalogue is not an object")]
+    if data.get("format") == COMPACT_FORMAT:
+        return _parse_compact(data, canonical, previous)
+
+    ad_db, errors = {}, []
+    for ad_id, ad_info in data.items():
+        error = validate_ad_entry(ad_id, ad_info, allowed_tags)
+        if error is not None:
+            errors.append((ad_id, error))
+            continue
+
+        entry = {
+            "file_path": ad_info["file_path"],
+            "tags": tuple(map(canonical.__getitem__, ad_info["tags"])),
+            "weight": float(ad_info.get("weight", 1.0)),
+        }
+        old = previous.get(ad_id)
+        ad_db[sys.intern(ad_id)] = old if old == entry else entry
+    return ad_db, errors
+
+
+def save_compact_ad_database(ad_db, path):
+    """카탈로그를 압축 형식으로 저장합니다. (태그 문자열은 한 번만 기록)"""
+    tag_ids = {}
+    ads = {}
+    for ad_id, ad_info in ad_db.items():
+        ids = [tag_ids.setdefault(tag, len(tag_ids)) for tag in ad_info["tags"]]
+        ads[ad_id] = [ad_info["file_path"], ids, ad_info.get("weight", 1.0)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"format": COMPACT_FORMAT, "tags": list(tag_ids), "ads": ads}, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def read_ad_database(json_path, previous=None):
+    """
+    광고 DB 파일을 읽고 검증합니다. (거부된 항목은 출력)
+
+    Returns:
+        dict: 검증된 광고 카탈로그 (파일 읽기/파싱 실패 시 None)
     """
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        return data
     except FileNotFoundError:
         print(f"Error: Ad database file not found at {json_path}")
-        return {}
+        return None
     except json.JSONDecodeError:
         print(f"Error: Failed to decode JSON from {json_path}")
-        return {}
\ No newline at end of file
+        return None
+
+    ad_db, errors = parse_ad_catalogue(data, previous=previous)
+    for ad_id, error in errors[:10]:
+        print(f"Warning: rejected ad '{ad_id}' in {json_path}: {error}")
+    if len(errors) > 10:
+        print(f"Warning: ... {len(errors) - 10} more ads rejected in {json_path}")
+    return ad_db
+
+
+def load_ad_database(json_path):
+    """
+    지정된 경로의 광고 DB JSON 파일을 로드합니다.
+    일반 형식과 압축 형식(save_compact_ad_database)을 모두 읽으며, 유효하지 않은 항목은 제외합니다.
+
+    Args:
+        json_path (str): 'config/ad_db.json' 파일 경로
+
+    Returns:
+        dict: 광고 정보 딕셔너리
+    """
+    ad_db = read_ad_database(json_path)
+    return ad_db if ad_db is not None else {}
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from config import settings
+
+
+class AdPreloader:
+    """
+    다음에 송출할 광고 영상을 백그라운드 스레드에서 미리 메모리로 읽어 둡니다.
+    광고 전환 시 디스크를 읽지 않고 바로 화면에 넘길 수 있습니다. (최근 AD_PRELOAD_CACHE_SIZE개 유지)
+    """
+    def __init__(self, max_items=None):
+        self.max_items = max_items or settings.AD_PRELOAD_CACHE_SIZE
+        self._cache = OrderedDict() # {ad_path: bytes}
+        self._loading = set()
+        self._lock = threading.Lock()
+
+    def preload(self, ad_path):
+        """ad_path를 백그라운드에서 읽기 시작합니다. (이미 캐시에 있거나 읽는 중이면 무시)"""
+        with self._lock:
+            if not ad_path or ad_path in self._cache or ad_path in self._loading:
+                return
+            self._loading.add(ad_path)
+        threading.Thread(target=self._load, args=(ad_path,), name="ad-preload", daemon=True).start()
+
+    def get(self, ad_path):
+        """미리 읽은 영상 데이터를 반환합니다. (아직 없으면 None)"""
+        with self._lock:
+            data = self._cache.get(ad_path)
+            if data is not None:
+                self._cache.move_to_end(ad_path)
+            return data
+
+    def _load(self, ad_path):
+        try:
+            with open(ad_path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Error preloading ad {ad_path}: {e}")
+            data = None
+        with self._lock:
+            self._loading.discard(ad_path)
+            if data is not None:
+                self._cache[ad_path] = data
+                while len(self._cache) > self.max_items:
+                    self._cache.popitem(last=False)
+
+
+class AdScheduler:
+    """
+    광고 선정 엔진 위에서 실제 송출 광고의 전환 시점을 결정하는 스케줄러. (화면/스트림당 하나)
+
+    - 선정 엔진은 AD_SCHEDULER_EVAL_INTERVAL_SEC 마다만 호출하고, 그 사이의 tick()은 현재 광고를 그대로 반환합니다.
+    - 히스테리시스: 새 후보 광고가 AD_SWITCH_PERSIST_SEC 동안 계속 선정되어야 전환합니다. (군중 구성이 잠깐 바뀌는 경우 무시)
+    - 최소 송출 시간: 현재 광고를 AD_MIN_DWELL_SEC 이상 송출한 뒤에만 전환합니다.
+    - 빈도 제한: 같은 광고는 최근 1시간 동안 AD_MAX_PLAYS_PER_HOUR 회까지만 새로 송출합니다.
+    - 후보가 처음 나타나면 preloader로 영상을 미리 읽어, 전환 시점에는 바로 재생할 수 있게 합니다.
+    """
+    def __init__(self, selection_engine, preloader=None):
+        self.selection_engine = selection_engine
+        self.preloader = preloader
+
+        self.current_ad = None
+        self.current_reason = "Waiting for selection..."
+        self.current_since = None
+
+        self._pending_ad = None # 전환 대기 중인 후보 광고
+        self._pending_reason = None
+        self._pending_since = None
+        self._next_eval = 0.0
+        self._plays = {} # {ad_path: deque[송출 시작 시각]} (빈도 제한용)
+
+    def tick(self, dominant_group, context_tags, stats_dict=None, now=None):
+        """
+        이번 틱에 송출할 광고를 결정합니다.
+
+        Returns:
+            tuple: (광고 파일 경로, 선정 이유, 이번 틱에 광고가 바뀌었는지 여부)
+        """
+        now = time.monotonic() if now is None else now
+        if now < self._next_eval:
+            return self.current_ad, self.current_reason, False
+        self._next_eval = now + settings.AD_SCHEDULER_EVAL_INTERVAL_SEC
+
+        candidate, reason = self.selection_engine.select_ad(dominant_group, context_tags, stats_dict)
+
+        # 처음에는 대기 없이 바로 송출
+        if self.current_since is None:
+            self._switch(candidate, reason, now)
+            return self.current_ad, self.current_reason, True
+
+        if candidate == self.current_ad or self._is_capped(candidate, now):
+            self._pending_ad = self._pending_since = None
+            if candidate == self.current_ad:
+                self.current_reason = reason
+            return self.current_ad, self.current_reason, False
+
+        # 새 후보: 히스테리시스 시작 + 영상 미리 읽기
+        if candidate != self._pending_ad or self._pending_since is None:
+            self._pending_ad, self._pending_since = candidate, now
+            if self.preloader is not None:
+                self.preloader.preload(candidate)
+        self._pending_reason = reason
+
+        if (now - self._pending_since >= settings.AD_SWITCH_PERSIST_SEC
+                and now - self.current_since >= settings.AD_MIN_DWELL_SEC):
+            self._switch(candidate, reason, now)
+            return self.current_ad, self.current_reason, True
+        return self.current_ad, self.current_reason, False
+
+    def _switch(self, ad_path, reason, now):
+        self.current_ad, self.current_reason, self.current_since = ad_path, reason, now
+        self._pending_ad = self._pending_since = None
+        if ad_path:
+            self._plays.setdefault(ad_path, deque()).append(now)
+
+    def _is_capped(self, ad_path, now):
+        """최근 1시간 동안의 송출 횟수가 빈도 제한에 도달했는지 확인합니다."""
+        if not ad_path or not settings.AD_MAX_PLAYS_PER_HOUR:
+            return False
+        plays = self._plays.get(ad_path)
+        if not plays:
+            return False
+        while plays and now - plays[0] >= 3600:
+            plays.popleft()
+        return len(plays) >= settings.AD_MAX_PLAYS_PER_HOUR
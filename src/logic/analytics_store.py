@@ -0,0 +1,259 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from config import settings
+from src.utils.metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audience_samples (
+    ts REAL NOT NULL,
+    stream_id INTEGER NOT NULL,
+    ad_path TEXT NOT NULL,
+    time_tag TEXT NOT NULL,
+    weather_tag TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    count REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audience_samples_ts ON audience_samples (ts);
+
+CREATE TABLE IF NOT EXISTS {rollup}_audience (
+    bucket TEXT NOT NULL,
+    stream_id INTEGER NOT NULL,
+    ad_path TEXT NOT NULL,
+    weather_tag TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (bucket, stream_id, ad_path, weather_tag, tag)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS {rollup}_airtime (
+    bucket TEXT NOT NULL,
+    stream_id INTEGER NOT NULL,
+    ad_path TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (bucket, stream_id, ad_path)
+) WITHOUT ROWID;
+"""
+
+# 롤업 단위: (테이블 접두사, 타임스탬프 -> 버킷 문자열 형식)
+ROLLUPS = {
+    "hour": ("hourly", "%Y-%m-%d %H:00"),
+    "day": ("daily", "%Y-%m-%d"),
+}
+
+
+class AnalyticsStore:
+    """
+    집계된 인구통계, Context 태그, 송출 중인 광고를 로컬 SQLite에 영구 저장하는 분석 싱크.
+
+    - record()는 스트림별로 ANALYTICS_SAMPLE_INTERVAL_SEC 마다 한 번만 스냅샷을 버퍼에 넣고 바로 반환합니다.
+      (DB 쓰기는 프레임 루프에서 일어나지 않음)
+    - 백그라운드 스레드가 ANALYTICS_FLUSH_INTERVAL_SEC 마다 버퍼를 한 트랜잭션으로 일괄 기록하면서,
+      시간/일 단위 롤업 테이블을 증분 갱신(UPSERT)합니다.
+    - 조회 API는 원본 샘플이 아닌 롤업 테이블만 읽으므로 몇 달치 데이터도 밀리초 단위로 조회됩니다.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path or settings.ANALYTICS_DB_PATH
+        self._buffer = deque()
+        self._last_record = {} # {stream_id: 마지막 기록 시각}
+        self._last_purge = 0.0
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 쓰기 전용 연결 (기록 스레드와 종료 시 flush가 _write_lock으로 공유)
+        self._conn = self._connect(check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL") # 기록 중에도 조회 가능
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for prefix, _ in ROLLUPS.values():
+            self._conn.executescript(SCHEMA.format(rollup=prefix))
+
+    def _connect(self, check_same_thread=True):
+        return sqlite3.connect(self.db_path, timeout=10, check_same_thread=check_same_thread)
+
+    # --- 기록 ---
+    def start(self):
+        """백그라운드 기록 스레드를 시작합니다. (종료 시 남은 버퍼도 기록)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._flush_loop, name="analytics-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self.flush()
+
+    def record(self, stream_id, stats_dict, context_tags, ad_path, timestamp=None):
+        """
+        스트림의 현재 집계 결과를 기록 버퍼에 추가합니다. (샘플 간격 이내의 호출은 무시)
+
+        Args:
+            stream_id (int): 스트림(카메라) 번호
+            stats_dict (dict): {tag: count} 집계 결과
+            context_tags (list): [time_tag, weather_tag]
+            ad_path (str): 송출 중인 광고 경로 (없으면 None)
+
+        Returns:
+            bool: 버퍼에 추가했으면 True
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        last = self._last_record.get(stream_id)
+        if last is not None and timestamp - last < settings.ANALYTICS_SAMPLE_INTERVAL_SEC:
+            return False
+        self._last_record[stream_id] = timestamp
+
+        # 직전 샘플 이후 경과 시간을 광고 송출 시간으로 계산 (중단 구간은 샘플 간격의 2배로 제한)
+        elapsed = settings.ANALYTICS_SAMPLE_INTERVAL_SEC if last is None else timestamp - last
+        elapsed = min(elapsed, 2 * settings.ANALYTICS_SAMPLE_INTERVAL_SEC)
+        time_tag, weather_tag = context_tags[0], context_tags[1]
+        self._buffer.append((timestamp, stream_id, ad_path or "", time_tag, weather_tag, dict(stats_dict), elapsed))
+        return True
+
+    def flush(self):
+        """버퍼의 샘플을 한 트랜잭션으로 기록하고 롤업 테이블을 증분 갱신합니다."""
+        with self._write_lock:
+            snapshots = []
+            while self._buffer:
+                snapshots.append(self._buffer.popleft())
+            if not snapshots:
+                return 0
+
+            with metrics.span("analytics_flush"):
+                sample_rows = [
+                    (ts, stream_id, ad_path, time_tag, weather_tag, tag, count)
+                    for ts, stream_id, ad_path, time_tag, weather_tag, stats, _ in snapshots
+                    for tag, count in stats.items()
+                ]
+                with self._conn: # 한 트랜잭션으로 커밋
+                    self._conn.executemany("INSERT INTO audience_samples VALUES (?, ?, ?, ?, ?, ?, ?)", sample_rows)
+                    for prefix, bucket_format in ROLLUPS.values():
+                        self._upsert_rollup(self._conn, prefix, bucket_format, snapshots)
+                    self._purge_raw_samples(self._conn)
+            return len(snapshots)
+
+    def _upsert_rollup(self, conn, prefix, bucket_format, snapshots):
+        """이번 배치를 버킷별로 미리 합산한 뒤 롤업 테이블에 더합니다."""
+        audience, airtime = {}, {}
+        for ts, stream_id, ad_path, _, weather_tag, stats, elapsed in snapshots:
+            bucket = datetime.fromtimestamp(ts).strftime(bucket_format)
+            for tag, count in stats.items():
+                key = (bucket, stream_id, ad_path, weather_tag, tag)
+                samples, total = audience.get(key, (0, 0.0))
+                audience[key] = (samples + 1, total + count)
+            key = (bucket, stream_id, ad_path)
+            samples, seconds = airtime.get(key, (0, 0.0))
+            airtime[key] = (samples + 1, seconds + elapsed)
+
+        conn.executemany(
+            f"INSERT INTO {prefix}_audience VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (bucket, stream_id, ad_path, weather_tag, tag) DO UPDATE SET "
+            "samples = samples + excluded.samples, total = total + excluded.total",
+            [key + value for key, value in audience.items()],
+        )
+        conn.executemany(
+            f"INSERT INTO {prefix}_airtime VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (bucket, stream_id, ad_path) DO UPDATE SET "
+            "samples = samples + excluded.samples, seconds = seconds + excluded.seconds",
+            [key + value for key, value in airtime.items()],
+        )
+
+    def _purge_raw_samples(self, conn):
+        """보존 기간이 지난 원본 샘플을 삭제합니다. (롤업은 유지, 한 시간에 한 번)"""
+        now = time.time()
+        if not settings.ANALYTICS_RAW_RETENTION_DAYS or now - self._last_purge < 3600:
+            return
+        self._last_purge = now
+        conn.execute("DELETE FROM audience_samples WHERE ts < ?", (now - settings.ANALYTICS_RAW_RETENTION_DAYS * 86400,))
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(settings.ANALYTICS_FLUSH_INTERVAL_SEC):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error writing analytics: {e}")
+
+    # --- 조회 API ---
+    def query_audience(self, start=None, end=None, granularity="hour", stream_id=None, ad_path=None, by_ad=False):
+        """
+        기간별 평균 인구통계를 조회합니다.
+
+        Args:
+            start, end (datetime): 조회 구간 [start, end) (None이면 제한 없음)
+            granularity (str): "hour" 또는 "day"
+            stream_id (int): 특정 스트림만 조회 (None이면 전체)
+            ad_path (str): 특정 광고 송출 중의 데이터만 조회 (None이면 전체)
+            by_ad (bool): True이면 광고별로 나누어 집계
+
+        Returns:
+            list: [{"bucket", ("ad_path",) "tag", "avg_count", "samples"}] (버킷, 태그 순 정렬)
+                avg_count는 구간의 모든 스냅샷에 대한 평균 (태그가 없던 스냅샷은 0으로 계산), samples는 스냅샷 수
+        """
+        prefix, bucket_format = ROLLUPS[granularity]
+        where, params = self._filters(start, end, bucket_format, stream_id, ad_path)
+        keys = "bucket, ad_path" if by_ad else "bucket"
+        # 태그 행은 그 태그가 있었던 스냅샷에만 존재하므로, 분모는 같은 구간의 전체 스냅샷 수(airtime의 samples)
+        rows = self._query(
+            f"WITH audience AS (SELECT {keys}, tag, SUM(total) AS total FROM {prefix}_audience {where} "
+            f"GROUP BY {keys}, tag), "
+            f"snapshots AS (SELECT {keys}, SUM(samples) AS samples FROM {prefix}_airtime {where} GROUP BY {keys}) "
+            f"SELECT {keys}, tag, total / samples, samples FROM audience JOIN snapshots USING ({keys}) "
+            f"ORDER BY {keys}, tag", params + params)
+
+        columns = (["bucket", "ad_path"] if by_ad else ["bucket"]) + ["tag", "avg_count", "samples"]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def query_ad_report(self, start=None, end=None, granularity="day", stream_id=None):
+        """
+        광고별 송출 시간과 송출 중 평균 인구통계를 조회합니다.
+
+        Returns:
+            list: [{"bucket", "ad_path", "airtime_sec", "audience": {tag: avg_count}}]
+        """
+        prefix, bucket_format = ROLLUPS[granularity]
+        where, params = self._filters(start, end, bucket_format, stream_id, None)
+        airtime_rows = self._query(
+            f"SELECT bucket, ad_path, SUM(seconds) FROM {prefix}_airtime {where} "
+            "GROUP BY bucket, ad_path ORDER BY bucket, ad_path", params)
+
+        report = {(bucket, ad): {"bucket": bucket, "ad_path": ad, "airtime_sec": seconds, "audience": {}}
+                  for bucket, ad, seconds in airtime_rows}
+        for row in self.query_audience(start, end, granularity, stream_id, by_ad=True):
+            entry = report.get((row["bucket"], row["ad_path"]))
+            if entry is not None:
+                entry["audience"][row["tag"]] = row["avg_count"]
+        return list(report.values())
+
+    def _filters(self, start, end, bucket_format, stream_id, ad_path):
+        clauses, params = [], []
+        # 버킷 문자열은 사전순 = 시간순이므로 인덱스(PRIMARY KEY의 bucket)로 범위 조회
+        if start is not None:
+            clauses.append("bucket >= ?")
+            params.append(start.strftime(bucket_format))
+        if end is not None:
+            clauses.append("bucket < ?")
+            params.append(end.strftime(bucket_format))
+        if stream_id is not None:
+            clauses.append("stream_id = ?")
+            params.append(stream_id)
+        if ad_path is not None:
+            clauses.append("ad_path = ?")
+            params.append(ad_path)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _query(self, sql, params):
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+
+from config import settings
+from src.logic.ad_database import read_ad_database
+from src.utils.metrics import metrics
+
+
+class AdCatalogueWatcher:
+    """
+    광고 DB 파일을 감시하다가 바뀌면 백그라운드에서 다시 읽어 AdSelectionEngine에 교체합니다.
+
+    - AD_DB_WATCH_INTERVAL_SEC 마다 파일의 (mtime, size)만 확인하므로 평상시 비용은 stat 한 번입니다.
+    - 파일을 읽지 못했거나(작성 중/JSON 오류) 유효한 광고가 하나도 없으면 기존 카탈로그를 유지합니다.
+    - 유효하지 않은 항목(file_path 누락, 알 수 없는 태그 등)은 제외하고 나머지만 반영합니다.
+    - 로드/색인 시간은 metrics의 "ad_db_parse", "ad_db_index", "ad_db_reload"로 기록합니다.
+    """
+    def __init__(self, path, engine, interval=None):
+        self.path = path
+        self.engine = engine
+        self.interval = settings.AD_DB_WATCH_INTERVAL_SEC if interval is None else interval
+        self.reloads = 0
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """감시 스레드를 시작합니다. (이미 시작했거나 interval이 0이면 무시)"""
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="ad-catalogue-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """
+        파일이 바뀌었으면 다시 로드합니다.
+
+        Returns:
+            bool: 카탈로그를 교체했는지 여부
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        return self.reload()
+
+    def reload(self):
+        """파일을 다시 읽어 검증하고 엔진의 카탈로그를 교체합니다."""
+        start = time.perf_counter()
+        ad_db = read_ad_database(self.path, previous=self.engine.ad_db)
+        parsed = time.perf_counter()
+        if not ad_db:
+            print(f"Warning: keeping previous ad catalogue ({self.path} has no valid ads)")
+            return False
+
+        self.engine.swap_catalogue(ad_db)
+        end = time.perf_counter()
+        metrics.observe("ad_db_parse", parsed - start)
+        metrics.observe("ad_db_index", end - parsed)
+        metrics.observe("ad_db_reload", end - start)
+        self.reloads += 1
+        print(f"Ad catalogue reloaded: {len(ad_db)} ads "
+              f"in {(end - start) * 1000:.1f}ms (parse {(parsed - start) * 1000:.1f}ms)")
+        return True
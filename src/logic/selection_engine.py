@@ -1,42 +1,160 @@
+from config import settings
+
+
+class _CatalogueIndex:
+    """
+    광고 카탈로그와 역색인의 불변 스냅샷.
+    카탈로그가 바뀌면 새 스냅샷을 만들어 참조 하나만 교체하므로, 선정 중인 프레임은 잠금 없이
+    항상 일관된 (이전 또는 새) 카탈로그를 봅니다.
+    """
+    __slots__ = ("ad_db", "tag_index", "ad_tags", "ad_weights")
+
+    def __init__(self, ad_db, tag_index, ad_tags, ad_weights):
+        self.ad_db = ad_db
+        self.tag_index = tag_index   # e.g., {"20s_female": ("ad001",), "all": ("ad003",)}
+        self.ad_tags = ad_tags       # e.g., {"ad001": frozenset({"20s_female", "20s_male", "college"})}
+        self.ad_weights = ad_weights # scored 모드용 광고별 가중치 (기본값 1.0)
+
+
+def _build_index(ad_db):
+    """
+    태그 -> 광고 ID 역색인을 생성합니다.
+    색인의 광고 ID 리스트는 ad_db 순서를 유지하므로, find_ad_by_tag는
+    기존 선형 탐색과 같은 광고(해당 태그를 가진 첫 번째 광고)를 반환합니다.
+    """
+    tag_index, ad_tags, ad_weights = {}, {}, {}
+    for ad_id, ad_info in ad_db.items():
+        tags = frozenset(ad_info["tags"])
+        ad_tags[ad_id] = tags
+        ad_weights[ad_id] = float(ad_info.get("weight", 1.0))
+        for tag in tags:
+            tag_index.setdefault(tag, []).append(ad_id)
+    return _CatalogueIndex(ad_db, {tag: tuple(ids) for tag, ids in tag_index.items()}, ad_tags, ad_weights)
+
+
+def _find_in_index(index, tag):
+    """스냅샷에서 해당 태그를 가진 첫 번째 광고의 파일 경로를 찾습니다. (없으면 None)"""
+    ad_ids = index.tag_index.get(tag)
+    if ad_ids:
+        return index.ad_db[ad_ids[0]]["file_path"]
+    return None
+
+
 class AdSelectionEngine:
     def __init__(self, ad_database):
-        self.ad_db = ad_database
+        self._index = _build_index(ad_database)
 
-    def select_ad(self, dominant_group, context_tags):
+    # 현재 스냅샷의 필드 (읽기 전용)
+    ad_db = property(lambda self: self._index.ad_db)
+    tag_index = property(lambda self: self._index.tag_index)
+    ad_tags = property(lambda self: self._index.ad_tags)
+    ad_weights = property(lambda self: self._index.ad_weights)
+
+    def swap_catalogue(self, ad_database):
+        """
+        새 카탈로그로 교체합니다. (카탈로그 감시 스레드에서 호출)
+        색인은 호출한 스레드에서 새로 만들고, 완성된 스냅샷을 참조 한 번으로 교체하므로
+        select_ad를 호출하는 루프는 기다리지 않습니다.
+        """
+        self._index = _build_index(ad_database)
+
+    def select_ad(self, dominant_group, context_tags, stats_dict=None):
         """
         우선순위에 따라 광고를 선정합니다.
         1순위: Dominant Group
         2순위: Context Tags (날씨, 시간 등)
         3순위: 기본 광고 ('all')
-        
+
+        AD_SELECTION_MODE가 "scored"이면 select_ad_scored로 점수 기반 선정을 수행합니다.
+
         Args:
             dominant_group (str): e.g., "20s_female"
             context_tags (list): e.g., ["rainy_day", "morning_rush"]
+            stats_dict (dict): 집계된 군중 분포 (scored 모드에서 사용) e.g., {"20s_female": 15, "40s_male": 8}
 
         Returns:
             str: 송출할 광고 파일 경로 (e.g., "assets/ads/olive_young.mp4")
         """
-        
+        if settings.AD_SELECTION_MODE == "scored":
+            if stats_dict is None:
+                stats_dict = {dominant_group: 1} if dominant_group else {}
+            return self.select_ad_scored(stats_dict, context_tags)
+
+        index = self._index # 교체와 무관하게 한 번의 선정은 같은 스냅샷을 사용
+
         # [TODO] 1순위: Dominant Group 태그와 일치하는 광고 검색
-        ad_path = self.find_ad_by_tag(dominant_group)
+        ad_path = _find_in_index(index, dominant_group)
         if ad_path:
             return ad_path, "Targeted (Crowd)"
-        
+
         # [TODO] 2순위: Context 태그와 일치하는 광고 검색
         for tag in context_tags:
-            ad_path = self.find_ad_by_tag(tag)
+            ad_path = _find_in_index(index, tag)
             if ad_path:
                 return ad_path, f"Targeted (Context: {tag})"
-                
+
         # [TODO] 3순위: 'all' 태그가 붙은 기본 광고 검색
-        ad_path = self.find_ad_by_tag("all")
+        ad_path = _find_in_index(index, "all")
         if ad_path:
             return ad_path, "Default (All)"
-            
+
         return None, "No Ad Found"
 
+    def select_ad_scored(self, stats_dict, context_tags):
+        """
+        군중 분포 일치도, Context 태그, 광고별 가중치를 합산한 점수로 광고를 선정합니다.
+        후보는 역색인에서 태그가 하나라도 일치하는 광고만 가져오므로 O(일치 광고 수)입니다.
+
+        score = AD_SCORE_CROWD_WEIGHT   * (광고 태그에 해당하는 군중 비율)
+              + AD_SCORE_CONTEXT_WEIGHT * (일치하는 Context 태그 수)
+              + AD_SCORE_AD_WEIGHT      * (광고의 "weight", 기본값 1.0)
+
+        점수가 같으면 광고 ID 오름차순으로 선택하여 결과가 항상 결정적입니다.
+
+        Returns:
+            tuple: (광고 파일 경로, 선정 이유)
+        """
+        index = self._index # 교체와 무관하게 한 번의 선정은 같은 스냅샷을 사용
+        total = sum(stats_dict.values())
+
+        # 역색인의 포스팅 리스트를 따라가며 광고별 군중 수/Context 일치 수를 누적
+        crowd_counts = {}
+        for tag, count in stats_dict.items():
+            for ad_id in index.tag_index.get(tag, ()):
+                crowd_counts[ad_id] = crowd_counts.get(ad_id, 0) + count
+
+        context_counts = {}
+        for tag in set(context_tags):
+            for ad_id in index.tag_index.get(tag, ()):
+                context_counts[ad_id] = context_counts.get(ad_id, 0) + 1
+
+        candidates = crowd_counts.keys() | context_counts.keys() | set(index.tag_index.get("all", ()))
+
+        crowd_weight = settings.AD_SCORE_CROWD_WEIGHT / total if total else 0.0
+        context_weight = settings.AD_SCORE_CONTEXT_WEIGHT
+        ad_weight = settings.AD_SCORE_AD_WEIGHT
+
+        best_key = None
+        for ad_id in candidates:
+            score = (
+                crowd_weight * crowd_counts.get(ad_id, 0)
+                + context_weight * context_counts.get(ad_id, 0)
+                + ad_weight * index.ad_weights[ad_id]
+            )
+            # 점수 내림차순, 동점이면 광고 ID 오름차순
+            key = (-score, ad_id)
+            if best_key is None or key < best_key:
+                best_key = key
+
+        if best_key is None:
+            return None, "No Ad Found"
+
+        best_ad_id = best_key[1]
+        crowd_share = crowd_counts.get(best_ad_id, 0) / total if total else 0.0
+        return (
+            index.ad_db[best_ad_id]["file_path"],
+            f"Scored ({-best_key[0]:.2f}: crowd {crowd_share:.0%}, context {context_counts.get(best_ad_id, 0)})",
+        )
+
     def find_ad_by_tag(self, tag):
-        for ad_id, ad_info in self.ad_db.items():
-            if tag in ad_info["tags"]:
-                return ad_info["file_path"]
-        return None
\ No newline at end of file
+        return _find_in_index(self._index, tag)
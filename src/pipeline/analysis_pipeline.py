@@ -0,0 +1,387 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from config import settings
+from src.analysis.aggregator import DataAggregator
+from src.analysis.motion_gate import MotionGate
+from src.analysis.results import PersonDetections
+from src.pipeline.analysis_scheduler import AnalysisScheduler
+from src.analysis.tracker import PersonTracker
+from src.pipeline.inference_workers import WorkerUnavailableError
+from src.utils.metrics import metrics
+
+
+class DropOldestQueue:
+    """
+    크기가 제한된 스레드 안전 큐.
+    가득 찬 상태에서 put하면 가장 오래된 항목을 버리므로, 소비자가 느려도 생산자는 막히지 않습니다.
+    """
+    def __init__(self, maxsize):
+        self._items = deque(maxlen=max(1, maxsize))
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                metrics.inc("frames_dropped")
+            self._items.append(item) # maxlen 초과 시 가장 오래된 항목이 자동으로 제거됨
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """항목을 꺼냅니다. timeout 내에 항목이 없으면 None을 반환합니다."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def has_items(self):
+        with self._cond:
+            return bool(self._items)
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+
+
+class FramePacket:
+    """파이프라인 단계 사이를 오가는 프레임 단위 데이터"""
+    def __init__(self, stream_id, frame, frame_index, capture_time, restarted=False):
+        self.stream_id = stream_id
+        self.frame = frame
+        self.frame_index = frame_index
+        self.capture_time = capture_time
+        self.restarted = restarted # 데모 영상이 처음부터 다시 시작된 첫 프레임인지 여부
+        self.detections = PersonDetections.empty() # 박스/신뢰도 + 트랙 레이블 코드 (병렬 배열)
+        self.tracks = []
+
+
+class VideoStream:
+    """
+    카메라(영상 소스) 하나의 상태.
+    모델은 모든 스트림이 공유하고, 트래커/집계기/큐만 스트림별로 가집니다.
+    """
+    def __init__(self, stream_id, source):
+        self.stream_id = stream_id
+        self.source = source
+        self.tracker = PersonTracker()
+        self.aggregator = DataAggregator()
+        self.frame_queue = DropOldestQueue(settings.PIPELINE_QUEUE_SIZE)
+        self.motion_gate = MotionGate() if settings.MOTION_GATE_ENABLED else None
+        self.last_detections = PersonDetections.empty() # 움직임이 없을 때 재사용할 직전 감지 결과
+
+        self.latest = None # 가장 최근에 감지가 끝난 FramePacket
+        self.version = 0
+        self.classify_in_flight = False # 분류 요청이 처리 중이면 같은 트랙을 중복 요청하지 않음
+        self.generation = 0 # 트래커/집계기를 리셋할 때마다 증가 (리셋 이전에 요청한 분류 결과는 버림)
+        self.stale_dropped = 0 # 지연 한도를 넘어 버려진 프레임 수
+
+    def is_live(self):
+        """파일이 아닌 소스(카메라 인덱스, RTSP 등)는 실시간 소스로 간주합니다."""
+        return not (isinstance(self.source, str) and os.path.isfile(self.source))
+
+    @property
+    def dropped_frames(self):
+        return self.frame_queue.dropped + self.stale_dropped
+
+
+class AnalysisPipeline:
+    """
+    캡처 -> 감지(YOLO + 트래킹) -> 분류(연령/성별) 단계를 별도 스레드로 실행하는 파이프라인.
+
+    - 스트림마다 캡처 스레드가 하나씩 있고, 감지 스레드는 모든 스트림의 최신 프레임을
+      모아 한 번의 YOLO 호출로 배치 추론합니다.
+    - 단계 사이에는 크기가 제한된 큐를 두며, 뒤처지면 가장 오래된 프레임을 버립니다.
+    - 분류는 감지와 병렬로 비동기 실행되고, 결과는 트랙 레이블로 반영됩니다.
+    - UI(메인 스레드)는 wait_for_updates()로 갱신된 스트림의 최신 결과를 즉시 가져가 화면에 그립니다.
+    - 모델 없이(detector/classifier = None) 시작할 수 있으며, 그동안은 감지 없이 원본 프레임만 게시합니다.
+      모델이 준비되면 attach_models()로 연결합니다.
+    """
+    def __init__(self, sources, detector=None, classifier=None, boot_time=None):
+        self.detector = detector
+        self.classifier = classifier
+        # 시작 지표(첫 프레임/첫 분류까지 걸린 시간)의 기준 시각
+        self.boot_time = time.perf_counter() if boot_time is None else boot_time
+        self.time_to_first_frame = None
+        self.time_to_first_classification = None
+        self.streams = [VideoStream(stream_id, source) for stream_id, source in enumerate(sources)]
+
+        self._frame_ready = threading.Event()
+        # 스트림당 분류 요청은 최대 하나이므로 큐가 가득 차서 버려지는 요청은 없음
+        self._classify_queue = DropOldestQueue(len(self.streams))
+        self.analysis_scheduler = AnalysisScheduler()
+
+        # 트래커/집계기는 감지·분류 스레드와 UI 스레드가 함께 접근하므로 잠금으로 보호
+        self.lock = threading.Lock()
+        self._result_cond = threading.Condition()
+
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._active_captures = 0
+
+    # --- 공개 API ---
+    def start(self):
+        """단계별 워커 스레드를 시작합니다."""
+        self._stop_event.clear()
+        self._active_captures = len(self.streams)
+        workers = [(self._capture_loop, f"capture-{stream.stream_id}", (stream,)) for stream in self.streams]
+        workers += [(self._detect_loop, "detect", ()), (self._classify_loop, "classify", ())]
+        for target, name, args in workers:
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", args=args, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """모든 워커 스레드를 정지합니다."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def attach_models(self, detector, classifier):
+        """백그라운드에서 로드가 끝난 모델을 실행 중인 파이프라인에 연결합니다."""
+        self.classifier = classifier
+        self.detector = detector
+
+    def is_running(self):
+        return not self._stop_event.is_set()
+
+    def wait_for_updates(self, seen_versions, timeout=1.0):
+        """
+        seen_versions 이후 새 결과가 나온 스트림이 생길 때까지 기다립니다.
+
+        Args:
+            seen_versions (dict): {stream_id: 마지막으로 화면에 그린 version}
+
+        Returns:
+            list: 갱신된 스트림의 (stream_id, version, FramePacket) 리스트 (timeout 시 빈 리스트)
+        """
+        def collect():
+            return [
+                (stream.stream_id, stream.version, stream.latest)
+                for stream in self.streams
+                if stream.version != seen_versions.get(stream.stream_id, 0)
+            ]
+
+        with self._result_cond:
+            updates = collect()
+            if not updates:
+                self._result_cond.wait(timeout)
+                updates = collect()
+        return updates
+
+    def get_crowd_stats(self, stream_id):
+        """스트림 집계기에서 (dominant_group, stats_dict)를 스레드 안전하게 가져옵니다."""
+        with self.lock:
+            return self.streams[stream_id].aggregator.get_dominant_group_and_stats()
+
+    @property
+    def dropped_frames(self):
+        return sum(stream.dropped_frames for stream in self.streams)
+
+    # --- 단계별 워커 ---
+    def _capture_loop(self, stream):
+        cap = cv2.VideoCapture(stream.source)
+        is_live = stream.is_live()
+        # 파일 소스는 원래 FPS에 맞춰 읽음 (실시간 소스는 카메라 속도에 맞춰 read가 블록됨)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_period = 0.0 if is_live else 1.0 / fps
+
+        frame_index = 0
+        restarted = False
+        next_frame_time = time.perf_counter()
+
+        while not self._stop_event.is_set() and cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                if is_live:
+                    break
+                # 영상이 끝나면 처음부터 다시 재생 (데모용 루프)
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                frame_index = 0
+                restarted = True
+                continue
+
+            stream.frame_queue.put(FramePacket(stream.stream_id, frame, frame_index, time.perf_counter(), restarted))
+            metrics.inc("frames_captured")
+            self._frame_ready.set()
+            frame_index += 1
+            restarted = False
+
+            if frame_period:
+                next_frame_time += frame_period
+                delay = next_frame_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame_time = time.perf_counter() # 뒤처진 만큼은 따라잡지 않음
+
+        cap.release()
+        # 모든 스트림의 캡처가 끝나면 파이프라인 종료
+        with self.lock:
+            self._active_captures -= 1
+            if self._active_captures == 0:
+                self._stop_event.set()
+
+    def _collect_packets(self):
+        """각 스트림 큐에서 지연 한도 이내의 최신 프레임을 하나씩 꺼냅니다."""
+        packets = []
+        now = time.perf_counter()
+        for stream in self.streams:
+            packet = stream.frame_queue.get(timeout=0)
+            if packet is None:
+                continue
+            # 지연 한도를 넘긴 프레임은 처리하지 않고 버림
+            if now - packet.capture_time > settings.PIPELINE_MAX_LATENCY_SEC:
+                stream.stale_dropped += 1
+                metrics.inc("frames_dropped")
+                continue
+            packets.append(packet)
+        return packets
+
+    def _detect_loop(self):
+        while not self._stop_event.is_set():
+            if not self._frame_ready.wait(timeout=0.5):
+                continue
+            self._frame_ready.clear()
+
+            # 배치 크기를 키우기 위해 다른 스트림의 프레임이 도착할 때까지 잠깐 기다림
+            deadline = time.perf_counter() + settings.DETECTOR_BATCH_WAIT_SEC
+            while not all(stream.frame_queue.has_items() for stream in self.streams) and time.perf_counter() < deadline:
+                time.sleep(0.001)
+
+            packets = self._collect_packets()
+            if not packets:
+                continue
+
+            # 1. 움직임 게이트 - 변화가 없는 스트림은 직전 감지 결과를 재사용
+            # (모델 로드 전에는 감지 없이 원본 프레임만 게시)
+            detector = self.detector
+            to_detect = [packet for packet in packets if self._needs_detection(packet)] if detector else []
+            if detector:
+                # 게이트가 실제로 건너뛴 프레임만 집계 (모델 로드 전 프레임은 제외)
+                metrics.inc("yolo_skipped", len(packets) - len(to_detect))
+
+            # 2. [AI] 사람 감지 (YOLO) - 감지가 필요한 스트림의 프레임을 한 번에 배치 추론
+            failed = () # 감지에 실패한 스트림 ID
+            if to_detect:
+                try:
+                    with metrics.span("yolo"):
+                        detections_per_frame = detector.detect_persons_batch([packet.frame for packet in to_detect])
+                    for packet, detections in zip(to_detect, detections_per_frame):
+                        self.streams[packet.stream_id].last_detections = detections
+                        metrics.inc("detections", len(detections))
+                except Exception as e:
+                    # 감지 실패가 감지 스레드(화면 갱신)를 멈추지 않도록, 이번 배치는 감지 없이 원본 프레임만 게시
+                    # (빈 결과로 트래커를 갱신하면 트랙이 만료되어 같은 사람을 다시 세므로 트래킹도 건너뜀)
+                    metrics.inc("detect_errors")
+                    if not isinstance(e, WorkerUnavailableError):
+                        print(f"Error detecting persons: {e}")
+                    failed = {packet.stream_id for packet in to_detect}
+
+            for packet in packets:
+                stream = self.streams[packet.stream_id]
+                detections = None if packet.stream_id in failed else stream.last_detections
+                self._track_and_publish(stream, packet, detections)
+
+            # 다른 스트림의 프레임이 남아 있으면 대기 없이 다음 배치 처리
+            if any(stream.frame_queue.has_items() for stream in self.streams):
+                self._frame_ready.set()
+
+    def _needs_detection(self, packet):
+        stream = self.streams[packet.stream_id]
+        if packet.restarted:
+            stream.last_detections = PersonDetections.empty()
+            if stream.motion_gate is not None:
+                stream.motion_gate.reset()
+        if stream.motion_gate is None:
+            return True
+        return stream.motion_gate.should_detect(packet.frame)
+
+    def _track_and_publish(self, stream, packet, detections):
+        """
+        감지 결과로 트래킹/분류 요청을 수행하고 패킷을 게시합니다.
+        detections가 None이면(감지 실패) 트래커와 분류 요청은 건드리지 않고 원본 프레임만 게시합니다.
+        """
+        with self.lock:
+            if packet.restarted:
+                stream.aggregator.reset() # 집계기 리셋
+                stream.tracker.reset() # 트래커 리셋
+                stream.generation += 1
+        if detections is None:
+            self._publish(stream, packet)
+            return
+
+        with self.lock:
+
+            # 3. 트래킹 (레이블 코드는 트랙에서 가져와 패킷 전용 결과에 채움, 박스 배열은 공유)
+            with metrics.span("tracking"):
+                packet.tracks = stream.tracker.update(detections.boxes)
+            packet.detections = PersonDetections(
+                detections.boxes, detections.scores, stream.tracker.labels_for(packet.tracks))
+            pending_tracks = stream.tracker.pending_classification(packet.tracks)
+
+        # 4. 분류 요청 (스케줄러가 예산/비용/장면 변화로 시점과 대상을 결정, 분류 스레드에서 비동기 실행)
+        if pending_tracks and self.classifier is not None and not stream.classify_in_flight:
+            change_ratio = stream.motion_gate.last_change_ratio if stream.motion_gate is not None else None
+            selected, predicted_cost = self.analysis_scheduler.select(stream.stream_id, pending_tracks, change_ratio)
+            if selected:
+                stream.classify_in_flight = True
+                # 분류 중에 트랙 박스가 갱신될 수 있으므로 요청 시점의 박스를 함께 전달
+                boxes = np.array([track.box for track in selected], dtype=np.int32)
+                self._classify_queue.put((stream, stream.generation, packet.frame, selected, boxes, predicted_cost))
+
+        # 5. 최신 결과 게시
+        self._publish(stream, packet)
+
+    def _publish(self, stream, packet):
+        if self.time_to_first_frame is None:
+            self.time_to_first_frame = self._record_startup("time_to_first_frame")
+        with self._result_cond:
+            stream.latest = packet
+            stream.version += 1
+            self._result_cond.notify_all()
+
+    def _classify_loop(self):
+        while not self._stop_event.is_set():
+            job = self._classify_queue.get(timeout=0.5)
+            if job is None:
+                continue
+
+            stream, generation, frame, tracks, boxes, predicted_cost = job
+            try:
+                start = time.perf_counter()
+                results = self.classifier.classify_persons(frame, boxes)
+                elapsed = time.perf_counter() - start
+                metrics.observe("classify", elapsed)
+                self.analysis_scheduler.record_cost(len(boxes), elapsed, predicted_cost)
+                if self.time_to_first_classification is None:
+                    self.time_to_first_classification = self._record_startup("time_to_first_classification")
+
+                with self.lock:
+                    # 분류 중에 영상이 다시 시작되어 트래커/집계기가 리셋되었으면 결과를 버림
+                    if generation == stream.generation:
+                        new_codes = stream.tracker.apply_classification(tracks, results)
+                        # 처음 분류된 사람만 집계기에 추가 (고유 인원 집계)
+                        stream.aggregator.add_data(new_codes)
+            except Exception as e:
+                # 분류 실패가 분류 스레드를 종료시키지 않도록 해당 요청만 건너뜀
+                # (트랙의 분류 시도 횟수, 집계기, 스케줄러 비용 보정은 갱신하지 않음)
+                metrics.inc("classify_errors")
+                if not isinstance(e, WorkerUnavailableError):
+                    print(f"Error classifying stream {stream.stream_id}: {e}")
+            finally:
+                with self.lock:
+                    stream.classify_in_flight = False
+
+    def _record_startup(self, name):
+        """boot_time 이후 경과 시간을 시작 지표로 기록하고 반환합니다."""
+        elapsed = time.perf_counter() - self.boot_time
+        metrics.observe(name, elapsed)
+        print(f"[startup] {name}: {elapsed:.2f}s")
+        return elapsed
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from config import settings
+from src.utils.metrics import metrics
+
+
+class AnalysisScheduler:
+    """
+    언제, 누구를 연령/성별 분류할지 결정하는 적응형 스케줄러. (고정 ANALYSIS_INTERVAL_FRAMES 대체)
+
+    - CPU 예산: 분류에 쓸 수 있는 시간을 ANALYSIS_CPU_BUDGET(코어 비율) 속도로 적립하고(최대 ANALYSIS_BURST_SEC),
+      측정된 분류 비용만큼 차감합니다. 적립된 시간이 부족하면 분류를 미룹니다.
+    - 지연 예산: 한 번의 분류 요청이 ANALYSIS_MAX_JOB_SEC를 넘지 않도록 인원수를 제한합니다.
+    - 분류 비용은 1인당 처리 시간의 지수 이동 평균(EMA)으로 추정합니다.
+    - 아직 분류되지 않은 새 트랙을 먼저, 그다음 재분류 대상(신뢰도 낮음/얼굴 미검출)을 시도 횟수가 적은 순으로 고릅니다.
+    - 재분류만 남은 경우에는 ANALYSIS_RETRY_INTERVAL_SEC 마다, 또는 장면 변화(움직임 게이트의 변화 비율)가
+      ANALYSIS_SCENE_CHANGE_RATIO 이상일 때만 시도합니다.
+    - 분류할 사람이 없으면(빈 장면) 분류하지 않습니다.
+
+    감지 스레드(select)와 분류 스레드(record_cost)가 함께 호출하므로 내부 상태는 잠금으로 보호합니다.
+    """
+    def __init__(self):
+        self.cost_per_person = settings.ANALYSIS_INITIAL_COST_SEC # 1인당 분류 시간 추정치 (EMA)
+        self._budget = settings.ANALYSIS_BURST_SEC # 적립된 분류 가능 시간 (초)
+        self._last_refill = time.perf_counter()
+        self._last_retry = {} # {stream_id: 마지막 재분류 요청 시각}
+        self._lock = threading.Lock()
+
+    def select(self, stream_id, pending_tracks, change_ratio=None, now=None):
+        """
+        이번 프레임에 분류할 트랙을 고릅니다.
+
+        Args:
+            stream_id (int): 스트림 번호
+            pending_tracks (list): 분류가 필요한 Track 리스트
+            change_ratio (float): 움직임 게이트의 최근 변화 픽셀 비율 (없으면 None)
+
+        Returns:
+            tuple: (분류할 Track 리스트, 예상 비용(초)) - 분류하지 않으면 ([], 0.0)
+        """
+        if not pending_tracks:
+            return [], 0.0
+        now = time.perf_counter() if now is None else now
+
+        new_tracks = [track for track in pending_tracks if track.classify_attempts == 0]
+        if not new_tracks:
+            # 재분류만 남은 경우: 일정 간격 또는 장면이 크게 바뀌었을 때만 시도
+            scene_changed = change_ratio is not None and change_ratio >= settings.ANALYSIS_SCENE_CHANGE_RATIO
+            last_retry = self._last_retry.get(stream_id)
+            if not scene_changed and last_retry is not None and now - last_retry < settings.ANALYSIS_RETRY_INTERVAL_SEC:
+                return [], 0.0
+
+        with self._lock:
+            self._refill(now)
+            # 지연 예산(1인당 비용이 예산보다 커도 최소 1명)과 적립된 CPU 예산 안에서 처리할 수 있는 인원수
+            cost = max(self.cost_per_person, 1e-4)
+            limit = min(len(pending_tracks), max(1, int(settings.ANALYSIS_MAX_JOB_SEC / cost)), int(self._budget / cost))
+            if limit < 1:
+                metrics.inc("classify_deferred")
+                return [], 0.0
+
+            # 새 트랙 우선, 그다음 시도 횟수가 적고 신뢰도가 낮은 순
+            ordered = sorted(pending_tracks, key=lambda t: (t.classify_attempts > 0, t.classify_attempts, t.confidence))
+            selected = ordered[:limit]
+            predicted_cost = len(selected) * self.cost_per_person
+            self._budget -= predicted_cost
+
+        if any(track.classify_attempts > 0 for track in selected):
+            self._last_retry[stream_id] = now
+        return selected, predicted_cost
+
+    def record_cost(self, num_persons, seconds, predicted_cost):
+        """실제 분류 시간을 반영하여 비용 추정치와 예산을 보정합니다."""
+        if num_persons <= 0:
+            return
+        with self._lock:
+            alpha = settings.ANALYSIS_COST_EMA_ALPHA
+            self.cost_per_person += alpha * (seconds / num_persons - self.cost_per_person)
+            self._budget -= seconds - predicted_cost # 예상보다 오래 걸린 만큼 추가 차감 (빨랐으면 환급)
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        # 1인당 비용이 적립 한도보다 커도 언젠가는 한 명을 분류할 수 있도록 한도를 보정
+        cap = max(settings.ANALYSIS_BURST_SEC, self.cost_per_person)
+        self._budget = min(cap, self._budget + elapsed * settings.ANALYSIS_CPU_BUDGET)
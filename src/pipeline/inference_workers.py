@@ -0,0 +1,299 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+from config import settings
+from src.analysis.results import codes_to_tags
+from src.utils.metrics import metrics
+
+
+class WorkerUnavailableError(RuntimeError):
+    """워커가 재시작 중이거나 응답하지 않아 실제 추론 결과를 얻지 못했음을 나타냅니다."""
+
+
+class SharedFrameRing:
+    """
+    프레임을 워커 프로세스에 넘기기 위한 공유 메모리 링 버퍼.
+    프레임 픽셀은 슬롯에 한 번 복사될 뿐 피클링되지 않고, 큐로는 (오프셋, shape, dtype)만 전달합니다.
+
+    요청은 응답을 받을 때까지 기다리는 동기 방식이므로, 한 요청의 프레임 수가 슬롯 수 이하이면
+    워커가 읽는 중인 슬롯을 덮어쓰지 않습니다.
+    """
+    def __init__(self, num_slots, slot_bytes):
+        self.num_slots = num_slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=num_slots * slot_bytes)
+        self._next_slot = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def fits(self, frames):
+        return len(frames) <= self.num_slots and all(frame.nbytes <= self.slot_bytes for frame in frames)
+
+    def write(self, frame):
+        """
+        다음 슬롯에 프레임을 복사합니다.
+
+        Returns:
+            tuple: 워커에서 프레임을 복원할 (offset, shape, dtype) 설명자
+        """
+        offset = self._next_slot * self.slot_bytes
+        self._next_slot = (self._next_slot + 1) % self.num_slots
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.shm.buf, offset=offset)
+        view[...] = frame
+        return offset, frame.shape, frame.dtype.str
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _read_frame(shm, descriptor):
+    """공유 메모리 슬롯을 복사 없이 numpy 배열로 봅니다."""
+    offset, shape, dtype = descriptor
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+_spawn_env_lock = threading.Lock()
+
+
+def _start_with_thread_env(process, num_threads):
+    """
+    연산 스레드 수 환경 변수를 설정한 상태로 워커 프로세스를 시작합니다.
+    OpenMP/OpenBLAS는 numpy/cv2를 임포트할 때 환경 변수를 읽고, spawn된 워커는 진입 함수보다 먼저
+    이 모듈(과 numpy/cv2)을 임포트하므로 자식 안에서 설정하면 늦습니다. 따라서 부모 환경을 잠시 바꿔 상속시킵니다.
+    """
+    with _spawn_env_lock:
+        saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        os.environ.update({name: str(num_threads) for name in THREAD_ENV_VARS})
+        try:
+            process.start()
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def _pin_threads(num_threads):
+    """워커 프로세스 하나가 쓰는 연산 스레드 수를 고정합니다. (환경 변수는 _start_with_thread_env에서 상속)"""
+    cv2.setNumThreads(num_threads)
+    settings.INFERENCE_NUM_THREADS = num_threads # onnxruntime / openvino 백엔드
+
+
+def _worker_main(kind, num_threads, request_queue, result_queue):
+    """
+    워커 프로세스 진입점. 모델을 로드/워밍업한 뒤 요청을 처리합니다.
+
+    요청: (request_id, shm_name, frame_descriptors, person_boxes)
+    응답: (request_id, result) / 준비 완료 시 ("ready", None)
+    """
+    _pin_threads(num_threads)
+    if kind == "detector":
+        from src.analysis.detector import PersonDetector
+        model = PersonDetector()
+    else:
+        from src.analysis.classifier import DemographicClassifier
+        model = DemographicClassifier()
+    try:
+        import sys
+        if "torch" in sys.modules: # ultralytics가 이미 임포트한 경우에만 (임포트 비용 회피)
+            sys.modules["torch"].set_num_threads(num_threads)
+    except Exception:
+        pass
+    if settings.MODEL_WARMUP:
+        model.warmup()
+    result_queue.put(("ready", None))
+
+    attached = None
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        request_id, shm_name, descriptors, person_boxes = request
+
+        # 링 버퍼가 다시 만들어졌으면 새로 연결
+        if attached is None or attached.name != shm_name:
+            if attached is not None:
+                attached.close()
+            attached = shared_memory.SharedMemory(name=shm_name)
+
+        frames = [_read_frame(attached, descriptor) for descriptor in descriptors]
+        if kind == "detector":
+            result = model.detect_persons_batch(frames)
+        else:
+            result = model.classify_persons(frames[0], person_boxes)
+        del frames # 공유 메모리를 닫기 전에 뷰를 해제
+        result_queue.put((request_id, result))
+
+    if attached is not None:
+        attached.close()
+
+
+class _WorkerProxy:
+    """
+    별도 프로세스에서 실행되는 모델의 호출 대리자 (감지/분류 공통).
+
+    - 프레임은 SharedFrameRing으로, 박스/레이블 같은 작은 결과만 큐로 주고받습니다.
+    - 워커가 죽거나 WORKER_TIMEOUT_SEC 안에 응답하지 않으면 WorkerUnavailableError를 발생시키고
+      백그라운드에서 워커를 다시 시작합니다. 재시작 중의 요청도 기다리지 않고 바로 같은 예외를 발생시킵니다.
+      빈 결과를 실제 결과처럼 돌려주지 않으므로, 파이프라인은 오류 경로에서 트래커/집계기/스케줄러 갱신을
+      건너뛰고 화면 표시만 계속합니다.
+    """
+    KIND = None
+
+    def __init__(self, num_threads=None):
+        self.num_threads = num_threads or settings.WORKER_NUM_THREADS or max(1, (os.cpu_count() or 2) // 2)
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._ring = None
+        self._process = None
+        self._request_queue = None
+        self._result_queue = None
+        self._request_id = 0
+        self._lock = threading.Lock() # 요청-응답을 한 번에 하나씩 처리
+        self._ready = threading.Event()
+        self._restart_thread = None
+        self._closed = False
+        if not self._start_process():
+            self.close()
+            raise RuntimeError(f"{self.KIND} worker failed to start")
+        atexit.register(self.close)
+
+    def _start_process(self):
+        self._close_queues() # 이전 워커의 큐(피더 스레드/파이프) 정리
+        self._request_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_worker_main, name=f"inference-{self.KIND}",
+            args=(self.KIND, self.num_threads, self._request_queue, self._result_queue), daemon=True)
+        _start_with_thread_env(self._process, self.num_threads)
+        # 모델 로드 + 워밍업이 끝날 때까지 대기
+        if self._wait_for("ready", settings.WORKER_START_TIMEOUT_SEC) is None:
+            if not self._closed:
+                print(f"[{self.KIND} worker] did not become ready in {settings.WORKER_START_TIMEOUT_SEC}s")
+            return False
+        self._ready.set()
+        return True
+
+    def _restart_process(self):
+        """죽었거나 응답이 없는 워커를 종료하고, 준비될 때까지 다시 시작합니다. (재시작 스레드에서 실행)"""
+        while not self._closed:
+            self.restarts += 1
+            metrics.inc("worker_restarts")
+            print(f"[{self.KIND} worker] restarting (exit code: {self._process.exitcode})")
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join(timeout=1.0)
+            if self._start_process():
+                return
+            time.sleep(1.0)
+
+    def _close_queues(self):
+        """요청/응답 큐를 닫고 피더 스레드가 끝날 때까지 기다립니다. (워커를 종료한 뒤 호출)"""
+        for q in (self._request_queue, self._result_queue):
+            if q is not None:
+                q.close()
+                q.join_thread()
+        self._request_queue = self._result_queue = None
+
+    def _wait_for(self, request_id, timeout):
+        """request_id의 응답을 기다립니다. 워커가 죽었거나 시간 초과면 None"""
+        remaining = timeout
+        while remaining > 0 and not self._closed:
+            try:
+                response_id, result = self._result_queue.get(timeout=min(0.5, remaining))
+            except queue.Empty:
+                if not self._process.is_alive():
+                    return None
+                remaining -= 0.5
+                continue
+            if response_id == request_id:
+                return (result,)
+            # 이전에 시간 초과된 요청의 늦은 응답은 버림
+        return None
+
+    def _ensure_ring(self, frames):
+        if self._ring is not None and self._ring.fits(frames):
+            return
+        if self._ring is not None:
+            self._ring.close()
+        slot_bytes = max(frame.nbytes for frame in frames)
+        self._ring = SharedFrameRing(max(len(frames), settings.WORKER_RING_SLOTS), slot_bytes)
+
+    def _call(self, frames, person_boxes):
+        with self._lock:
+            if not self._ready.is_set():
+                raise WorkerUnavailableError(f"{self.KIND} worker is restarting")
+            frames = [np.ascontiguousarray(frame) for frame in frames]
+            self._ensure_ring(frames)
+            descriptors = [self._ring.write(frame) for frame in frames]
+
+            self._request_id += 1
+            self._request_queue.put((self._request_id, self._ring.name, descriptors, person_boxes))
+            response = self._wait_for(self._request_id, settings.WORKER_TIMEOUT_SEC)
+            if response is None:
+                self._ready.clear()
+                self._restart_thread = threading.Thread(
+                    target=self._restart_process, name=f"restart-{self.KIND}", daemon=True)
+                self._restart_thread.start()
+                raise WorkerUnavailableError(f"{self.KIND} worker did not respond")
+            return response[0]
+
+    def warmup(self):
+        pass # 워커 프로세스가 시작할 때 워밍업함
+
+    def close(self):
+        self._closed = True
+        self._ready.clear()
+        # 재시작 중이면 재시작 스레드가 큐/프로세스를 다시 만들지 않도록 먼저 끝냄 (_wait_for가 닫힘을 확인)
+        if self._restart_thread is not None:
+            self._restart_thread.join(timeout=settings.WORKER_TIMEOUT_SEC + 2.0)
+        if self._process is not None and self._process.is_alive():
+            self._request_queue.put(None)
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.kill()
+        with self._lock:
+            self._close_queues()
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
+
+
+class DetectorWorkerProxy(_WorkerProxy):
+    """PersonDetector와 같은 인터페이스로 사람 감지를 워커 프로세스에서 실행합니다."""
+    KIND = "detector"
+
+    def detect_persons(self, frame):
+        return self.detect_persons_batch([frame])[0]
+
+    def detect_persons_batch(self, frames):
+        if not frames:
+            return []
+        return self._call(frames, None)
+
+
+class ClassifierWorkerProxy(_WorkerProxy):
+    """DemographicClassifier와 같은 인터페이스로 연령/성별 분류를 워커 프로세스에서 실행합니다."""
+    KIND = "classifier"
+
+    def classify_persons(self, frame, person_boxes):
+        boxes = np.asarray(person_boxes, dtype=np.int32).reshape(-1, 4)
+        if len(boxes) == 0:
+            return np.empty(0, dtype=np.int8), np.empty(0, dtype=np.float32)
+        return self._call([frame], boxes)
+
+    def classify_demographics(self, frame, person_boxes):
+        codes, _ = self.classify_persons(frame, person_boxes)
+        return codes_to_tags(codes)
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from config import settings
+from src.utils.metrics import metrics
+
+
+class BackgroundModelLoader:
+    """
+    감지/분류 모델을 백그라운드 스레드에서 로드하고 워밍업합니다.
+    모델이 준비되는 동안에도 캡처와 화면 표시는 바로 시작할 수 있습니다. (빠른 시작)
+    """
+    def __init__(self):
+        self.detector = None
+        self.classifier = None
+        self.error = None
+        self.load_seconds = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """로드 스레드를 시작합니다. (이미 시작했으면 무시)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def is_ready(self):
+        """로드가 끝났는지 (성공/실패 무관) 확인합니다."""
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            if settings.INFERENCE_WORKERS:
+                # 모델을 별도 워커 프로세스에서 실행 (프레임은 공유 메모리로 전달, 워커가 시작 시 워밍업)
+                from src.pipeline.inference_workers import ClassifierWorkerProxy, DetectorWorkerProxy
+                factories = (("detector", DetectorWorkerProxy), ("classifier", ClassifierWorkerProxy))
+            else:
+                # 무거운 임포트(ultralytics/torch 등)도 이 스레드에서 처리
+                from src.analysis.classifier import DemographicClassifier
+                from src.analysis.detector import PersonDetector
+                factories = (("detector", PersonDetector), ("classifier", DemographicClassifier))
+        except Exception as e:
+            self.error = e
+            print(f"Error loading models: {e}")
+            factories = ()
+
+        # 모델별로 로드/워밍업하여 한 모델의 실패가 다른 모델까지 버리지 않도록 함
+        # (워밍업 실패는 기록만 하고 모델은 그대로 연결, 첫 실제 추론에서 지연을 부담)
+        for name, factory in factories:
+            try:
+                model = factory()
+            except Exception as e:
+                self.error = e
+                print(f"Error loading {name}: {e}")
+                continue
+            if settings.MODEL_WARMUP:
+                try:
+                    with metrics.span(f"{name}_warmup"):
+                        model.warmup()
+                except Exception as e:
+                    print(f"Warning: {name} warm-up failed: {e}")
+            setattr(self, name, model)
+
+        self.load_seconds = time.perf_counter() - start
+        print(f"Model loading finished in {self.load_seconds:.2f}s")
+        self._ready.set()
@@ -0,0 +1,150 @@
+import json
+import multiprocessing
+import os
+import time
+
+import cv2
+from config import settings
+from src.analysis.aggregator import DataAggregator
+from src.analysis.results import DEMOGRAPHIC_TAGS
+from src.logic.ad_database import load_ad_database
+from src.logic.selection_engine import AdSelectionEngine
+
+# 워커 프로세스별로 한 번만 로드하는 모델
+_worker_models = None
+
+
+def _init_worker(num_threads):
+    """워커 프로세스 초기화: 스레드 수를 제한하고 모델을 한 번 로드합니다."""
+    global _worker_models
+    # 여러 워커가 동시에 돌 때 코어 과점유(oversubscription)를 막기 위해 스레드 수 고정
+    cv2.setNumThreads(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    from src.analysis.classifier import DemographicClassifier
+    from src.analysis.detector import PersonDetector
+    _worker_models = (PersonDetector(), DemographicClassifier())
+
+
+def analyze_segment(task):
+    """
+    영상의 한 구간을 분석합니다. (워커 프로세스에서 실행)
+    프레임별 결과는 이전 프레임에 의존하지 않으므로, 워커 수와 관계없이 결과가 같습니다.
+
+    Args:
+        task (tuple): (video_path, start_frame, end_frame)
+
+    Returns:
+        list: 프레임별 {"frame", "boxes", "demographics"} 딕셔너리 리스트
+              demographics는 분석 프레임에서만 박스별 그룹 코드 배열 (그 외 None)
+    """
+    video_path, start_frame, end_frame = task
+    detector, classifier = _worker_models
+
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    records = []
+    for frame_index in range(start_frame, end_frame):
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        detections = detector.detect_persons(frame)
+        demographics = None
+        # 분석 간격은 영상 전체 기준 프레임 번호로 결정 (구간 분할과 무관)
+        if frame_index % settings.ANALYSIS_INTERVAL_FRAMES == 0:
+            demographics, _ = classifier.classify_persons(frame, detections.boxes)
+
+        records.append({
+            "frame": frame_index,
+            "boxes": detections.boxes.tolist(),
+            "demographics": demographics,
+        })
+
+    cap.release()
+    return records
+
+
+def _split_segments(video_path, segment_frames):
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    segments = [
+        (video_path, start, min(start + segment_frames, total_frames))
+        for start in range(0, total_frames, segment_frames)
+    ]
+    return segments, fps
+
+
+def run_offline_analysis(video_paths, output_path, workers=None, segment_frames=300, context_tags=None,
+                         ad_db_path="config/ad_db.json"):
+    """
+    녹화된 영상을 UI 없이 CPU가 허용하는 최대 속도로 분석하여 JSONL로 저장합니다.
+
+    긴 영상은 segment_frames 단위 구간으로 나누어 프로세스 풀에 분배하고,
+    구간 결과는 순서대로 받아 집계/광고 선정을 순차적으로 수행합니다.
+    (집계기는 영상 시간 기준으로 동작하므로 출력은 워커 수와 무관하게 동일합니다.)
+
+    Args:
+        video_paths (list): 분석할 영상 파일 경로 리스트
+        output_path (str): 결과 JSONL 파일 경로
+        workers (int): 워커 프로세스 수 (기본값: CPU 코어 수)
+        segment_frames (int): 구간당 프레임 수
+        context_tags (list): 광고 선정에 사용할 고정 컨텍스트 태그 (e.g., ["rainy_day"])
+
+    Returns:
+        dict: {"frames": 처리한 프레임 수, "seconds": 소요 시간, "fps": 초당 처리 프레임 수}
+    """
+    workers = workers or os.cpu_count() or 1
+    context_tags = context_tags or []
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    ad_engine = AdSelectionEngine(load_ad_database(ad_db_path))
+
+    start_time = time.perf_counter()
+    total_frames = 0
+
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(num_threads,)) as pool, \
+            open(output_path, "w", encoding="utf-8") as out:
+        for video_path in video_paths:
+            segments, fps = _split_segments(video_path, segment_frames)
+            aggregator = DataAggregator()
+            video_start = time.perf_counter()
+            video_frames = 0
+
+            # imap은 구간 순서를 보장하므로 결과를 받는 즉시 순서대로 기록
+            for records in pool.imap(analyze_segment, segments):
+                for record in records:
+                    timestamp = record["frame"] / fps
+                    codes = record["demographics"]
+                    if codes is not None:
+                        aggregator.add_data(codes, timestamp)
+                        # 출력 파일(JSONL)에는 박스별 태그로 기록 (미분류는 None)
+                        record["demographics"] = [DEMOGRAPHIC_TAGS[code] if code >= 0 else None for code in codes.tolist()]
+
+                    dominant_group, stats_dict = aggregator.get_dominant_group_and_stats(timestamp)
+                    ad_path, reason = ad_engine.select_ad(dominant_group, context_tags, stats_dict)
+
+                    record.update({
+                        "video": video_path,
+                        "dominant_group": dominant_group,
+                        "stats": stats_dict,
+                        "ad": ad_path,
+                        "reason": reason,
+                    })
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                video_frames += len(records)
+
+            elapsed = time.perf_counter() - video_start
+            print(f"{video_path}: {video_frames} frames, {video_frames / elapsed if elapsed else 0:.1f} fps")
+            total_frames += video_frames
+
+    seconds = time.perf_counter() - start_time
+    return {"frames": total_frames, "seconds": seconds, "fps": total_frames / seconds if seconds else 0.0}
@@ -0,0 +1,93 @@
+import time
+
+import cv2
+import numpy as np
+from config import settings
+from src.utils.drawing import draw_results
+from src.utils.metrics import metrics
+
+class StreamDisplay:
+    """
+    스트림 하나의 대시보드 위젯(영상, 통계, 광고)을 갱신하는 표시 계층.
+
+    - 영상은 DISPLAY_FPS 이하로만 내보내며, DISPLAY_MAX_WIDTH로 축소한 뒤 JPEG로 직접 인코딩하여 전송합니다.
+    - 통계/선정 이유/광고 위젯은 값이 바뀌었을 때만 다시 전송합니다.
+    따라서 분석 처리량은 브라우저가 프레임을 받아가는 속도와 무관합니다.
+    """
+    def __init__(self, video_placeholder, stats_placeholder, ad_reason_placeholder, ad_video_placeholder):
+        self.video_placeholder = video_placeholder
+        self.stats_placeholder = stats_placeholder
+        self.ad_reason_placeholder = ad_reason_placeholder
+        self.ad_video_placeholder = ad_video_placeholder
+
+        self._frame_interval = 1.0 / settings.DISPLAY_FPS if settings.DISPLAY_FPS else 0.0
+        self._last_frame_time = 0.0
+        self._last_stats = None
+        self._last_reason = None
+        # 광고 상태를 저장하여 동일한 광고가 반복 재생되지 않도록 함
+        self.current_ad_path = None
+
+    def frame_due(self, now=None):
+        """목표 표시 FPS 기준으로 이번에 프레임을 내보낼 차례인지 확인합니다."""
+        now = time.perf_counter() if now is None else now
+        return now - self._last_frame_time >= self._frame_interval
+
+    def show_frame(self, frame, boxes, labels):
+        """프레임을 미리보기 해상도로 축소하고 박스/레이블을 그려 JPEG로 전송합니다."""
+        self._last_frame_time = time.perf_counter()
+
+        # 1. 축소 후 그리기 (박스 좌표도 같은 비율로 변환)
+        height, width = frame.shape[:2]
+        scale = min(1.0, settings.DISPLAY_MAX_WIDTH / width)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+            boxes = (np.asarray(boxes, dtype=np.float32).reshape(-1, 4) * scale).astype(np.int32)
+
+        with metrics.span("draw_results"):
+            output_frame = draw_results(frame, boxes, labels)
+
+        # 2. JPEG 인코딩 후 전송 (Streamlit의 PNG 변환을 거치지 않음)
+        with metrics.span("streamlit_push"):
+            ok, encoded = cv2.imencode(".jpg", output_frame, [cv2.IMWRITE_JPEG_QUALITY, settings.DISPLAY_JPEG_QUALITY])
+            if ok:
+                self.video_placeholder.image(encoded.tobytes(), use_column_width=True)
+
+    def show_stats(self, stats_dict):
+        """집계 통계가 바뀌었을 때만 차트를 다시 그립니다."""
+        # 지수 감쇠 모드처럼 값이 연속적으로 변하는 경우를 위해 표시 단위로 반올림하여 비교
+        stats = {tag: round(count, 1) for tag, count in stats_dict.items()}
+        if stats == self._last_stats:
+            return
+        self._last_stats = stats
+
+        with metrics.span("streamlit_push"):
+            if stats:
+                self.stats_placeholder.bar_chart(stats)
+            else:
+                self.stats_placeholder.write("Detecting crowd...")
+
+    def show_ad(self, ad_path, reason, video_data=None):
+        """
+        선정 이유와 광고 영상을 값이 바뀌었을 때만 갱신합니다.
+
+        Args:
+            video_data (bytes): 미리 읽어 둔 광고 영상 데이터 (있으면 파일 대신 사용)
+
+        Returns:
+            bool: 광고 영상이 바뀌었으면 True
+        """
+        if reason != self._last_reason:
+            self._last_reason = reason
+            self.ad_reason_placeholder.info(f"선정 이유: **{reason}**")
+
+        # 광고가 바뀌었을 때만 비디오를 새로 로드
+        if ad_path and ad_path != self.current_ad_path:
+            self.current_ad_path = ad_path
+            with metrics.span("streamlit_push"):
+                source = video_data if video_data is not None else ad_path
+                self.ad_video_placeholder.video(source, loop=True, autoplay=True, muted=True)
+            return True
+        if not ad_path and self.current_ad_path is not None:
+            self.ad_video_placeholder.empty() # 송출할 광고가 없으면 비움
+            self.current_ad_path = None
+        return False
@@ -14,7 +14,7 @@ def draw_results(frame, boxes, labels):
 
     Args:
         frame (np.array): 원본 BGR 프레임
-        boxes (list): (x1, y1, x2, y2) 좌표 리스트
+        boxes (np.array): (N, 4) 정수 박스 배열 (또는 (x1, y1, x2, y2) 좌표 리스트)
         labels (list): e.g., ["20s_female", "40s_male"]
 
     Returns:
@@ -28,7 +28,7 @@ def draw_results(frame, boxes, labels):
         return frame # 오류 시 원본 반환
 
     for box, label in zip(boxes, labels):
-        x1, y1, x2, y2 = box
+        x1, y1, x2, y2 = (int(v) for v in box)
 
         # 1. 바운딩 박스 그리기
         cv2.rectangle(output_frame, (x1, y1), (x2, y2), BOX_COLOR, FONT_THICKNESS)
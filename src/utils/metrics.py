@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from config import settings
+
+_NULL_SPAN = nullcontext() # 비활성화 시 재사용하는 빈 컨텍스트 (할당 없음)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _Span:
+    """with 블록의 실행 시간을 측정하여 Metrics에 기록합니다."""
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Metrics:
+    """
+    추론 루프 계측기.
+    단계별 실행 시간(span)은 최근 METRICS_WINDOW 개 샘플의 롤링 히스토그램으로,
+    이벤트 수(감지 수, 얼굴 검출/실패, 드롭 프레임, 광고 전환 등)는 누적 카운터로 기록합니다.
+
+    비활성화 상태에서는 span()이 공유 nullcontext를 반환하고 inc()는 즉시 반환하므로
+    오버헤드가 거의 없습니다.
+    """
+    def __init__(self, enabled=False, window=1000):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}  # {stage: deque[seconds]}
+        self._totals = {}   # {stage: [count, sum_seconds]} (Prometheus summary용 누적값)
+        self._counters = {} # {name: value}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def span(self, name):
+        """
+        단계 실행 시간을 측정하는 컨텍스트 매니저를 반환합니다.
+
+        사용 예:
+            with metrics.span("yolo"):
+                boxes = detector.detect_persons(frame)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def inc(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        """
+        현재 통계를 딕셔너리로 반환합니다.
+
+        Returns:
+            dict: {"stages": {stage: {"count", "sum", "p50", "p95", "p99"}}, "counters": {name: value}}
+        """
+        with self._lock:
+            samples = {name: np.fromiter(values, dtype=np.float64) for name, values in self._samples.items()}
+            totals = {name: tuple(values) for name, values in self._totals.items()}
+            counters = dict(self._counters)
+
+        stages = {}
+        for name, values in samples.items():
+            quantiles = np.quantile(values, QUANTILES) if len(values) else [0.0] * len(QUANTILES)
+            stages[name] = {
+                "count": totals[name][0],
+                "sum": totals[name][1],
+                **{f"p{int(q * 100)}": float(v) for q, v in zip(QUANTILES, quantiles)},
+            }
+        return {"stages": stages, "counters": counters}
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 노출 형식으로 변환합니다."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP smartad_stage_seconds Rolling latency of each inference loop stage",
+            "# TYPE smartad_stage_seconds summary",
+        ]
+        for stage, stats in sorted(snap["stages"].items()):
+            for q in QUANTILES:
+                lines.append(f'smartad_stage_seconds{{stage="{stage}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'smartad_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'smartad_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE smartad_{name}_total counter")
+            lines.append(f"smartad_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def format_log_line(self):
+        """주기적 로그용 한 줄 요약 (단계별 p50/p95 ms, 카운터)"""
+        snap = self.snapshot()
+        stages = " ".join(
+            f"{name}={s['p50'] * 1000:.1f}/{s['p95'] * 1000:.1f}ms" for name, s in sorted(snap["stages"].items()))
+        counters = " ".join(f"{name}={value}" for name, value in sorted(snap["counters"].items()))
+        return f"[metrics] {stages} | {counters}"
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """로컬 /metrics 엔드포인트를 백그라운드 스레드로 시작합니다."""
+        if self._server is not None:
+            return self._server
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass # 요청 로그 출력 안 함
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
+
+    def start_log_reporter(self, interval_sec):
+        """interval_sec 마다 요약 로그 한 줄을 출력하는 스레드를 시작합니다."""
+        def report():
+            while True:
+                time.sleep(interval_sec)
+                print(self.format_log_line())
+
+        threading.Thread(target=report, name="metrics-log", daemon=True).start()
+
+
+# 모든 모듈이 공유하는 전역 계측기
+metrics = Metrics(enabled=settings.METRICS_ENABLED, window=settings.METRICS_WINDOW)
@@ -0,0 +1,186 @@
+"""
+추론 백엔드용 모델 변환/양자화 도구
+
+1. YOLO(.pt)를 고정 입력 형태(1 x 3 x YOLO_INPUT_SIZE x YOLO_INPUT_SIZE)의 ONNX(fp32)로 변환합니다. (ultralytics 필요)
+   입력 형태가 고정되어야 ONNX Runtime / OpenVINO가 정적 그래프로 최적화합니다.
+2. ONNX(fp32) 모델을 참조 영상 프레임으로 보정(calibration)하여 int8(QDQ)로 정적 양자화합니다. (onnxruntime 필요)
+   YOLO의 마지막 검출 헤드(박스 좌표 0~640과 클래스 점수 0~1을 합치는 Concat 등)는 fp32로 남깁니다.
+3. fp32/int8 ONNX를 OpenVINO IR(.xml/.bin)로 변환합니다. (openvino 설치 시)
+
+int8 모델을 쓰기 전에 benchmarks/compare_backends.py로 fp32 대비 mAP를 확인한 뒤 INFERENCE_PRECISION = "int8"로 바꿉니다.
+
+얼굴/나이/성별 네트워크는 TF/Caffe 원본이므로, ONNX(fp32)로 변환한 파일
+(ONNX_MODEL_PATHS의 face/age/gender 경로, precision = fp32)이 있을 때만 처리합니다.
+이때 입력은 OpenCV Blob과 같은 NCHW(BGR, 평균값 차감) 형식, 출력은 OpenCV DNN과 같은 형태여야 합니다.
+
+실행 (프로젝트 루트에서):
+    python -m tools.export_models --calibration-clip assets/videos/street_demo.mp4
+"""
+import argparse
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+from config import settings
+from src.analysis.backends import yolo_blob
+
+MODEL_KEYS = ("person", "face", "age", "gender")
+PRECISIONS = ("fp32", "int8")
+# 양자화하지 않을 YOLO 검출 헤드 출력부 연산 (출력 Concat과 그 입력인 클래스 Sigmoid / 박스 stride 곱)
+HEAD_OP_TYPES = ("Concat", "Sigmoid", "Mul")
+FACE_SIZE = (300, 300)
+AGE_GENDER_SIZE = (227, 227)
+MODEL_MEAN_VALUES = (104.0, 177.0, 123.0)
+
+
+def model_path(paths, key, precision):
+    return paths[key].format(precision=precision)
+
+
+def export_yolo_onnx(output_path):
+    """ultralytics로 YOLO를 고정 입력 형태(배치 1, YOLO_INPUT_SIZE)의 ONNX로 변환합니다."""
+    from ultralytics import YOLO
+
+    exported = YOLO(settings.YOLO_MODEL_PATH).export(
+        format="onnx", imgsz=settings.YOLO_INPUT_SIZE, batch=1, dynamic=False, simplify=True)
+    shutil.move(exported, output_path)
+    print(f"YOLO exported: {output_path}")
+
+
+def read_calibration_frames(clip_path, num_frames):
+    """참조 영상에서 고르게 num_frames 장을 샘플링합니다."""
+    cap = cv2.VideoCapture(clip_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or num_frames
+    frames = []
+    for index in np.linspace(0, max(total - 1, 0), num_frames).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(frame)
+    cap.release()
+    if not frames:
+        raise RuntimeError(f"No calibration frames could be read from {clip_path}")
+    return frames
+
+
+def face_crops_for_calibration(frames):
+    """
+    나이/성별 모델 보정용 얼굴 크롭을 모읍니다.
+    기본 OpenCV DNN 얼굴 검출기로 찾고, 찾지 못하면 프레임 중앙 크롭으로 대체합니다.
+    """
+    from src.analysis.classifier import DemographicClassifier
+
+    crops = []
+    classifier = DemographicClassifier()
+    if classifier.FACE_NET is not None:
+        for frame in frames:
+            faces, _ = classifier._detect_faces_full_frame(frame)
+            crops.extend(frame[y1:y2, x1:x2] for x1, y1, x2, y2 in faces)
+    if not crops:
+        for frame in frames:
+            height, width = frame.shape[:2]
+            crops.append(frame[height // 4: 3 * height // 4, width // 4: 3 * width // 4])
+    return crops
+
+
+def make_calibration_blobs(key, frames, face_crops):
+    """모델 키별로 실제 추론과 같은 전처리를 거친 보정 입력 Blob 리스트를 생성합니다."""
+    if key == "person":
+        return [yolo_blob([frame], settings.YOLO_INPUT_SIZE)[0] for frame in frames]
+    if key == "face":
+        return [cv2.dnn.blobFromImage(frame, 1.0, FACE_SIZE, MODEL_MEAN_VALUES, swapRB=False) for frame in frames]
+    return [cv2.dnn.blobFromImage(crop, 1.0, AGE_GENDER_SIZE, MODEL_MEAN_VALUES, swapRB=False) for crop in face_crops]
+
+
+def detection_head_nodes(onnx_path):
+    """
+    YOLO 출력을 만드는 마지막 검출 헤드 노드 이름을 찾습니다.
+    출력 노드(Concat)와 그 직접 입력 중 Sigmoid(클래스 점수) / Mul(박스 좌표 stride 곱) 노드를 반환합니다.
+    박스 좌표(0~640)와 클래스 점수(0~1)가 하나의 uint8 스케일을 공유하면 신뢰도가 뭉개지므로 양자화에서 제외합니다.
+    """
+    import onnx
+
+    graph = onnx.load(onnx_path, load_external_data=False).graph
+    producers = {output: node for node in graph.node for output in node.output}
+    excluded = []
+    for graph_output in graph.output:
+        node = producers.get(graph_output.name)
+        if node is None or node.op_type not in HEAD_OP_TYPES:
+            continue
+        excluded.append(node.name)
+        for node_input in node.input:
+            producer = producers.get(node_input)
+            if producer is not None and producer.op_type in HEAD_OP_TYPES:
+                excluded.append(producer.name)
+    return [name for name in excluded if name]
+
+
+def quantize_int8(fp32_path, int8_path, blobs, nodes_to_exclude=None):
+    """onnxruntime 정적 양자화 (QDQ, 가중치 채널별 int8)"""
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_name = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class BlobReader(CalibrationDataReader):
+        def __init__(self):
+            self._iter = iter(blobs)
+
+        def get_next(self):
+            blob = next(self._iter, None)
+            return None if blob is None else {input_name: blob.astype(np.float32)}
+
+    quantize_static(
+        fp32_path, int8_path, BlobReader(),
+        quant_format=QuantFormat.QDQ, per_channel=True,
+        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+        nodes_to_exclude=nodes_to_exclude or [],
+    )
+    print(f"Quantized: {int8_path}" + (f" (kept in fp32: {nodes_to_exclude})" if nodes_to_exclude else ""))
+
+
+def convert_openvino(onnx_path, xml_path):
+    try:
+        import openvino as ov
+    except ImportError:
+        print("openvino is not installed; skipping OpenVINO IR conversion.")
+        return
+    ov.save_model(ov.convert_model(onnx_path), xml_path)
+    print(f"OpenVINO IR: {xml_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and int8-quantize models for ONNX Runtime / OpenVINO")
+    parser.add_argument("--calibration-clip", default=settings.DEMO_VIDEO_PATH, help="보정에 사용할 참조 영상")
+    parser.add_argument("--calibration-frames", type=int, default=64, help="보정 프레임 수")
+    parser.add_argument("--skip-yolo-export", action="store_true", help="이미 변환한 yolov8n_fp32.onnx 사용")
+    args = parser.parse_args()
+
+    os.makedirs(settings.MODEL_EXPORT_DIR, exist_ok=True)
+    if not args.skip_yolo_export:
+        export_yolo_onnx(model_path(settings.ONNX_MODEL_PATHS, "person", "fp32"))
+
+    frames = read_calibration_frames(args.calibration_clip, args.calibration_frames)
+    face_crops = None
+
+    for key in MODEL_KEYS:
+        fp32_path = model_path(settings.ONNX_MODEL_PATHS, key, "fp32")
+        if not os.path.exists(fp32_path):
+            print(f"[skip] {key}: {fp32_path} not found")
+            continue
+
+        if key in ("age", "gender") and face_crops is None:
+            face_crops = face_crops_for_calibration(frames)
+
+        int8_path = model_path(settings.ONNX_MODEL_PATHS, key, "int8")
+        nodes_to_exclude = detection_head_nodes(fp32_path) if key == "person" else None
+        quantize_int8(fp32_path, int8_path, make_calibration_blobs(key, frames, face_crops), nodes_to_exclude)
+        for precision in PRECISIONS:
+            convert_openvino(
+                model_path(settings.ONNX_MODEL_PATHS, key, precision), model_path(settings.OPENVINO_MODEL_PATHS, key, precision))
+
+
+if __name__ == "__main__":
+    main()